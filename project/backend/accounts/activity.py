@@ -0,0 +1,83 @@
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+class LastLoginWriter:
+    """
+    Per-process write-behind buffer for User.last_login.
+
+    Logins only record the time in memory; the buffer is written with one
+    bulk UPDATE every interval (or once threshold users are pending), so a
+    user logging in repeatedly costs at most one write per interval. An
+    interval of 0 writes through on every login.
+    """
+
+    def __init__(self, interval=None, threshold=None):
+        self.interval = interval if interval is not None else getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', 60)
+        self.threshold = threshold if threshold is not None else getattr(settings, 'LAST_LOGIN_FLUSH_THRESHOLD', 500)
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.flusher = None
+
+    def record(self, user, when=None):
+        """Note a login; also sets user.last_login on the instance for the response"""
+        when = when or timezone.now()
+        user.last_login = when
+        if self.interval <= 0:
+            User.objects.filter(pk=user.pk).update(last_login=when)
+            return
+        with self.lock:
+            self.pending[user.pk] = when
+            count = len(self.pending)
+        if count >= self.threshold:
+            self.flush()
+        else:
+            self.start_flusher()
+
+    def start_flusher(self):
+        if self.flusher is not None:
+            return
+        with self.lock:
+            if self.flusher is None:
+                self.flusher = threading.Thread(target=self.run_flusher, name='last-login-flusher', daemon=True)
+                self.flusher.start()
+
+    def run_flusher(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            finally:
+                # Don't keep a connection open in an idle background thread
+                connection.close()
+
+    def flush(self):
+        """Write all pending logins, returning the number of users updated"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return 0
+        users = [User(pk=pk, last_login=when) for pk, when in pending.items()]
+        try:
+            # bulk_update sends no post_save, so the auth user cache is left alone
+            User.objects.bulk_update(users, ['last_login'], batch_size=500)
+        except Exception:
+            logger.exception('Failed to flush last_login for %d users', len(pending))
+            # Keep the logins for the next flush unless newer ones arrived
+            with self.lock:
+                for pk, when in pending.items():
+                    self.pending.setdefault(pk, when)
+            return 0
+        return len(pending)
+
+last_login_writer = LastLoginWriter()
+
+# Flush buffered logins when the worker shuts down gracefully
+atexit.register(last_login_writer.flush)
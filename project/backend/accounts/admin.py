@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
-from .models import User, UserProfile
+from .models import BlacklistedToken, OutboundEmail, User, UserProfile
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -34,4 +34,20 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'newsletter_subscribed', 'marketing_emails', 'created_at')
     list_filter = ('newsletter_subscribed', 'marketing_emails', 'created_at')
     search_fields = ('user__email', 'user__first_name', 'user__last_name')
-    raw_id_fields = ('user',)
\ No newline at end of file
+    raw_id_fields = ('user',)
+
+@admin.register(BlacklistedToken)
+class BlacklistedTokenAdmin(admin.ModelAdmin):
+    """Blacklisted Token Admin"""
+    list_display = ('jti', 'expires_at', 'created_at')
+    search_fields = ('jti',)
+    ordering = ('-created_at',)
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    """Outbound Email Admin"""
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'to')
+    readonly_fields = ('attempts', 'locked_at', 'last_error', 'sent_at', 'created_at')
+    ordering = ('-created_at',)
@@ -0,0 +1,125 @@
+import copy
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from products.response_cache import is_process_local
+
+VERSION_KEY = 'auth:user:version:{}'
+USER_KEY = 'auth:user:{}'
+
+def get_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+def cache_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 30)
+
+class UserCache:
+    """
+    Per-process cache of users by id, optionally backed by the shared cache.
+
+    Each entry is stamped with the user's version from the shared cache,
+    which is checked on every lookup; invalidate() bumps the version, so a
+    saved or deactivated user is reloaded from the database by every
+    process on its next request, whatever is left in the local entries.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        """(user or None, current version)"""
+        shared = getattr(settings, 'AUTH_USER_CACHE_SHARED', False)
+        keys = [VERSION_KEY.format(user_id)]
+        if shared:
+            keys.append(USER_KEY.format(user_id))
+        values = get_cache().get_many(keys)
+        version = values.get(keys[0])
+        if version is None:
+            # Seed from the clock so an evicted counter never reuses an old version
+            get_cache().add(keys[0], int(time.time() * 1000), timeout=None)
+            version = get_cache().get(keys[0])
+            return None, version
+
+        entry = self.entries.get(user_id)
+        if entry is not None and entry[0] == version and entry[1] > time.monotonic():
+            return entry[2], version
+        if shared:
+            cached = values.get(keys[1])
+            if cached is not None and cached[0] == version:
+                self.store(user_id, cached[1], version, share=False)
+                return cached[1], version
+        return None, version
+
+    def store(self, user_id, user, version, share=True):
+        with self.lock:
+            self.entries[user_id] = (version, time.monotonic() + cache_timeout(), user)
+        if share and getattr(settings, 'AUTH_USER_CACHE_SHARED', False):
+            get_cache().set(USER_KEY.format(user_id), (version, user), cache_timeout())
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+        key = VERSION_KEY.format(user_id)
+        try:
+            get_cache().incr(key)
+        except ValueError:
+            get_cache().add(key, int(time.time() * 1000), timeout=None)
+
+user_cache = UserCache()
+
+def invalidate_user(user_id):
+    """
+    Drop a user's cached copy everywhere. Bumped straight away, so nothing
+    cached before the change is served again, and once more on commit, so a
+    copy reloaded before the transaction committed is not kept either.
+    Call this after queryset.update() on users, which sends no signals.
+    """
+    user_cache.invalidate(user_id)
+    transaction.on_commit(lambda: user_cache.invalidate(user_id))
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through user_cache
+    instead of running a SELECT on users for every request. Only used with
+    a shared AUTH_USER_CACHE_ALIAS backend; otherwise every request reads
+    the user from the database as JWTAuthentication does.
+    """
+
+    def load_user(self, user_id):
+        try:
+            return self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+    def get_user(self, validated_token):
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if is_process_local(get_cache()):
+            # Invalidations in this cache never reach the other workers, so
+            # a deactivated user could keep authenticating there
+            user = self.load_user(user_id)
+        else:
+            user, version = user_cache.get(user_id)
+            if user is None:
+                user = self.load_user(user_id)
+                user_cache.store(user_id, user, version)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if getattr(api_settings, 'CHECK_REVOKE_TOKEN', False):
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        # Views may modify request.user, so never hand out the cached instance itself
+        return copy.copy(user)
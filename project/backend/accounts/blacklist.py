@@ -0,0 +1,142 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from products.response_cache import is_process_local
+from .authentication import get_cache
+from .models import BlacklistedToken
+
+VERSION_KEY = 'auth:blacklist:version'
+
+# Rows created this long before the last sync are read again, covering
+# transactions that committed after a later one had already been seen
+SYNC_OVERLAP = timedelta(minutes=5)
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings using double hashing of one blake2b digest"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * step) % self.size for index in range(self.hashes)]
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+class TokenBlacklist:
+    """
+    Revoked token ids with an in-memory bloom filter in front of the indexed
+    token_blacklist table.
+
+    Most refreshes carry a token that was never revoked, which the filter
+    answers without touching the database; only filter hits are confirmed
+    with a lookup on jti. The filter is loaded lazily on the first check in
+    each process and rebuilt every TOKEN_BLACKLIST_REBUILD_INTERVAL seconds
+    so pruned rows drop out of it. Tokens revoked by other processes are
+    picked up through a version key in the AUTH_USER_CACHE_ALIAS cache,
+    bumped on every commit that adds one; when that cache is process-local
+    the filter is skipped and every check is an indexed lookup on jti.
+    """
+
+    def __init__(self):
+        self.bloom = None
+        self.version = None
+        self.synced_at = None
+        self.rebuild_at = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Rebuild the filter from every unexpired row"""
+        # Read the version first so tokens added while loading trigger a sync
+        version = get_cache().get(VERSION_KEY)
+        now = timezone.now()
+        jtis = list(BlacklistedToken.objects.filter(expires_at__gt=now).values_list('jti', flat=True))
+        capacity = max(getattr(settings, 'TOKEN_BLACKLIST_BLOOM_CAPACITY', 100000), 2 * len(jtis))
+        bloom = BloomFilter(capacity, getattr(settings, 'TOKEN_BLACKLIST_BLOOM_ERROR_RATE', 0.001))
+        for jti in jtis:
+            bloom.add(jti)
+        with self.lock:
+            self.bloom, self.version, self.synced_at = bloom, version, now
+            self.rebuild_at = time.monotonic() + getattr(settings, 'TOKEN_BLACKLIST_REBUILD_INTERVAL', 3600)
+        return len(jtis)
+
+    def sync(self):
+        """Bring the filter up to date with tokens revoked by other processes"""
+        if self.bloom is None or time.monotonic() >= self.rebuild_at:
+            self.load()
+            return
+        version = get_cache().get(VERSION_KEY)
+        if version == self.version:
+            return
+        now = timezone.now()
+        jtis = list(
+            BlacklistedToken.objects.filter(created_at__gte=self.synced_at - SYNC_OVERLAP)
+            .values_list('jti', flat=True)
+        )
+        with self.lock:
+            for jti in jtis:
+                self.bloom.add(jti)
+            self.version, self.synced_at = version, now
+        if self.bloom.count > 2 * getattr(settings, 'TOKEN_BLACKLIST_BLOOM_CAPACITY', 100000):
+            # Overfilled filters answer "maybe" too often; resize on the next lookup
+            self.rebuild_at = 0
+
+    def __contains__(self, jti):
+        if is_process_local(get_cache()):
+            # Revocations by other workers can't reach this filter; ask the table
+            return BlacklistedToken.objects.filter(jti=jti).exists()
+        self.sync()
+        if jti not in self.bloom:
+            return False
+        return BlacklistedToken.objects.filter(jti=jti).exists()
+
+    def add(self, jti, expires_at):
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(jti=jti, expires_at=expires_at)],
+            ignore_conflicts=True,
+        )
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+        transaction.on_commit(self.bump)
+
+    def bump(self):
+        try:
+            get_cache().incr(VERSION_KEY)
+        except ValueError:
+            get_cache().add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+token_blacklist = TokenBlacklist()
+
+def prune_blacklist(now=None, batch_size=1000):
+    """Delete rows for tokens that have expired anyway, returning the number removed"""
+    now = now or timezone.now()
+    removed = 0
+    while True:
+        ids = list(
+            BlacklistedToken.objects.filter(expires_at__lte=now)
+            .order_by().values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        removed += BlacklistedToken.objects.filter(pk__in=ids).delete()[0]
+    if removed:
+        token_blacklist.rebuild_at = 0
+    return removed
@@ -0,0 +1,64 @@
+import csv
+import json
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from .models import User, UserProfile
+
+# Optional columns copied onto the user as given
+USER_FIELDS = ['username', 'first_name', 'last_name', 'phone', 'address', 'city', 'state', 'postal_code', 'country']
+
+class ImportRowError(Exception):
+    """Raised for a row that can't be imported"""
+
+def read_rows(path, format=None):
+    """Stream dict rows from a CSV file (with a header) or a JSON Lines file"""
+    format = format or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(path, newline='', encoding='utf-8') as file:
+        if format == 'csv':
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+def hash_passwords(passwords):
+    """make_password for each plain password; run in the import's process pool"""
+    return [make_password(password) for password in passwords]
+
+def build_user(row):
+    """
+    Unsaved User for one import row, plus its plain password when it still
+    has to be hashed. Rows carry either a plain password or a password_hash
+    in a format one of PASSWORD_HASHERS understands; with neither, the
+    account gets an unusable password and has to reset it.
+    """
+    email = User.objects.normalize_email((row.get('email') or '').strip())
+    try:
+        validate_email(email)
+    except ValidationError:
+        raise ImportRowError(f'invalid email {email!r}')
+    values = {field: (row.get(field) or '').strip() for field in USER_FIELDS}
+    for field in USER_FIELDS:
+        max_length = User._meta.get_field(field).max_length
+        if max_length and len(values[field]) > max_length:
+            raise ImportRowError(f'{field} longer than {max_length} characters')
+    values['username'] = values['username'] or email
+
+    password = row.get('password') or None
+    password_hash = row.get('password_hash') or ''
+    if password_hash:
+        try:
+            # identify_hasher only looks at the prefix; decode checks the rest
+            identify_hasher(password_hash).decode(password_hash)
+        except (ValueError, AssertionError):
+            raise ImportRowError('unrecognised password_hash format')
+        password = None
+    elif password is None:
+        password_hash = make_password(None)
+    return User(email=email, password=password_hash, **values), password
+
+def save_users(users):
+    """Insert users and their profiles with one INSERT each"""
+    User.objects.bulk_create(users)
+    UserProfile.objects.bulk_create([UserProfile(user_id=user.pk) for user in users])
@@ -0,0 +1,49 @@
+import hashlib
+import re
+from django.contrib.auth.hashers import BasePasswordHasher, mask_hash
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+LEGACY_HASH_RE = re.compile(r'^legacy_sha256\$([^$]+)\$([0-9a-f]{64})$')
+
+class LegacySHA256PasswordHasher(BasePasswordHasher):
+    """
+    Salted SHA-256 hashes carried over from the legacy store, encoded as
+    legacy_sha256$<salt>$<hex sha256(salt + password)>.
+
+    Only kept so imported customers can still log in; must_update() makes
+    Django rehash with the default hasher on their first successful login.
+    """
+    algorithm = 'legacy_sha256'
+
+    def encode(self, password, salt):
+        self._check_encode_args(password, salt)
+        hash = hashlib.sha256((salt + password).encode()).hexdigest()
+        return f'{self.algorithm}${salt}${hash}'
+
+    def decode(self, encoded):
+        match = LEGACY_HASH_RE.match(encoded)
+        if match is None:
+            raise ValueError('Malformed legacy_sha256 hash')
+        return {'algorithm': self.algorithm, 'hash': match[2], 'salt': match[1]}
+
+    def verify(self, password, encoded):
+        try:
+            decoded = self.decode(encoded)
+        except ValueError:
+            return False
+        return constant_time_compare(encoded, self.encode(password, decoded['salt']))
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {
+            _('algorithm'): decoded['algorithm'],
+            _('salt'): mask_hash(decoded['salt'], show=2),
+            _('hash'): mask_hash(decoded['hash']),
+        }
+
+    def must_update(self, encoded):
+        return True
+
+    def harden_runtime(self, password, encoded):
+        pass
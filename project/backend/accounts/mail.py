@@ -0,0 +1,150 @@
+import smtplib
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import OutboundEmail
+
+# Errors about one message; anything else is taken to mean the connection is gone
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+def get_delivery_connection(**kwargs):
+    """Connection to the real mail server, used by the outbox worker"""
+    backend = getattr(settings, 'EMAIL_DELIVERY_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+    return get_connection(backend, **kwargs)
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Email backend that stores messages in the outbox instead of sending them.
+
+    send_mail() inside a request costs one INSERT, committed or rolled back
+    with the request's own changes; the send_queued_mail worker delivers
+    them. Messages with attachments or non-HTML alternatives aren't stored
+    and go straight to the delivery backend.
+    """
+
+    def send_messages(self, email_messages):
+        now = timezone.now()
+        rows = []
+        direct = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            alternatives = getattr(message, 'alternatives', [])
+            if message.attachments or message.content_subtype != 'plain' or any(
+                mimetype != 'text/html' for _, mimetype in alternatives
+            ):
+                direct.append(message)
+                continue
+            rows.append(OutboundEmail(
+                subject=message.subject,
+                body=message.body,
+                html_body=alternatives[0][0] if alternatives else '',
+                from_email=message.from_email,
+                to=list(message.to),
+                cc=list(message.cc),
+                bcc=list(message.bcc),
+                reply_to=list(message.reply_to),
+                headers=dict(message.extra_headers),
+                next_attempt_at=now,
+            ))
+        try:
+            OutboundEmail.objects.bulk_create(rows)
+            sent = get_delivery_connection(fail_silently=self.fail_silently).send_messages(direct) if direct else 0
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(rows) + (sent or 0)
+
+def build_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, email.to,
+        bcc=email.bcc, connection=connection, cc=email.cc, reply_to=email.reply_to, headers=email.headers,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+def retry_delay(attempts):
+    """Exponential backoff after the given number of failed attempts"""
+    delay = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 60) * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, getattr(settings, 'EMAIL_OUTBOX_MAX_RETRY_DELAY', 3600)))
+
+def claim_batch(batch_size=100):
+    """
+    Mark up to batch_size due emails as sending and return them. Emails left
+    in sending by a worker that died are taken again after
+    EMAIL_OUTBOX_LOCK_TIMEOUT seconds.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_LOCK_TIMEOUT', 600))
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.filter(
+                Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', locked_at__lt=stale)
+            )
+            .order_by('next_attempt_at')
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        for email in emails:
+            email.status = 'sending'
+            email.locked_at = now
+            email.attempts += 1
+        OutboundEmail.objects.bulk_update(emails, ['status', 'locked_at', 'attempts'])
+    return emails
+
+def deliver_batch(connection, batch_size=100):
+    """
+    Send one batch of due outbox emails over an open mail connection,
+    returning (sent, retried, failed).
+
+    The batch is claimed in its own short transaction so nothing is locked
+    while talking to the mail server. A refused message is retried with
+    backoff until EMAIL_OUTBOX_MAX_ATTEMPTS; a lost connection puts the rest
+    of the batch back for a later attempt as well.
+    """
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0, 0
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    sent, retried, failed = [], [], []
+    connection_error = None
+    try:
+        # Opened here so send_messages reuses it instead of reconnecting per message
+        connection.open()
+    except Exception as e:
+        connection_error = str(e) or e.__class__.__name__
+    for email in emails:
+        error = connection_error
+        if error is None:
+            try:
+                if connection.send_messages([build_message(email, connection)]):
+                    sent.append(email)
+                    continue
+                error = 'Not accepted by the mail backend'
+            except MESSAGE_ERRORS as e:
+                error = str(e)
+            except Exception as e:
+                connection.close()
+                error = connection_error = str(e) or e.__class__.__name__
+        email.last_error = error
+        (failed if email.attempts >= max_attempts else retried).append(email)
+
+    now = timezone.now()
+    for email in sent:
+        email.status = 'sent'
+        email.sent_at = now
+        email.last_error = ''
+    for email in retried:
+        email.status = 'pending'
+        email.next_attempt_at = now + retry_delay(email.attempts)
+    for email in failed:
+        email.status = 'failed'
+    for email in emails:
+        email.locked_at = None
+    OutboundEmail.objects.bulk_update(emails, ['status', 'sent_at', 'last_error', 'next_attempt_at', 'locked_at'])
+    return len(sent), len(retried), len(failed)
@@ -0,0 +1,110 @@
+import threading
+import time
+import uuid
+from unittest import mock
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+from accounts import views
+from accounts.activity import LastLoginWriter
+from accounts.models import User
+
+PASSWORD = 'bench-Password-123'
+
+class CountingWriter(LastLoginWriter):
+    """LastLoginWriter that counts the UPDATE statements it issues"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.updates = 0
+        self.count_lock = threading.Lock()
+
+    def count(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('UPDATE'):
+            with self.count_lock:
+                self.updates += 1
+        return execute(sql, params, many, context)
+
+    def record(self, user, when=None):
+        with connection.execute_wrapper(self.count):
+            super().record(user, when)
+
+    def flush(self):
+        with connection.execute_wrapper(self.count):
+            return super().flush()
+
+class Command(BaseCommand):
+    help = 'Measure login throughput with last_login written on every login vs coalesced per interval'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--logins', type=int, default=25, help='Logins per user')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent clients (threads)')
+        parser.add_argument('--interval', type=int, default=60, help='Flush interval for the coalesced run')
+        parser.add_argument(
+            '--fast-hasher', action='store_true',
+            help='Hash with MD5 so the numbers show database cost rather than PBKDF2'
+        )
+    
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                'SQLite serializes all writers; run against Postgres for real numbers'
+            ))
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher'] if options['fast_hasher'] else None
+        with override_settings(**({'PASSWORD_HASHERS': hashers} if hashers else {})):
+            tag = uuid.uuid4().hex[:8]
+            users = [
+                User.objects.create_user(
+                    email=f'bench-{tag}-{index}@example.com', username=f'bench-{tag}-{index}',
+                    password=PASSWORD, first_name='Bench', last_name='User',
+                )
+                for index in range(options['users'])
+            ]
+            try:
+                for mode, interval in (('direct', 0), ('coalesced', options['interval'])):
+                    self.run(mode, CountingWriter(interval=interval, threshold=10 ** 6), users, options)
+            finally:
+                User.objects.filter(pk__in=[user.pk for user in users]).delete()
+    
+    def run(self, mode, writer, users, options):
+        factory = APIRequestFactory()
+        view = views.UserLoginView.as_view()
+        emails = [user.email for user in users]
+        results = {'ok': 0, 'failed': 0}
+        results_lock = threading.Lock()
+        barrier = threading.Barrier(options['workers'])
+        
+        def worker(offset):
+            counts = {'ok': 0, 'failed': 0}
+            try:
+                barrier.wait()
+                for index in range(offset, len(emails) * options['logins'], options['workers']):
+                    request = factory.post(
+                        '/api/auth/login/', {'email': emails[index % len(emails)], 'password': PASSWORD}, format='json'
+                    )
+                    response = view(request)
+                    counts['ok' if response.status_code == 200 else 'failed'] += 1
+            finally:
+                connection.close()
+                with results_lock:
+                    for key, value in counts.items():
+                        results[key] += value
+        
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(options['workers'])]
+        with mock.patch.object(views, 'last_login_writer', writer):
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+            # What the background flusher (or the threshold) would write afterwards
+            flushed = writer.flush()
+        
+        total = results['ok'] + results['failed']
+        self.stdout.write(
+            f"{mode:>9}: {total} logins in {elapsed:.2f}s ({total / elapsed:.0f}/s), {results['failed']} failed, "
+            f"{writer.updates} UPDATE statements on users ({flushed} rows in the final flush)"
+        )
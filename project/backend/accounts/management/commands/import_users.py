@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from itertools import islice
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from accounts.bulk_import import ImportRowError, build_user, hash_passwords, read_rows, save_users
+from accounts.models import User
+
+class Command(BaseCommand):
+    help = (
+        'Import users from a CSV or JSON Lines file in batches, hashing plain passwords in a '
+        'process pool; rows may carry a password_hash instead (e.g. legacy_sha256$salt$hex)'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Default: from the file extension')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users inserted per transaction')
+        parser.add_argument('--processes', type=int, default=os.cpu_count(), help='Password hashing processes')
+    
+    def handle(self, *args, **options):
+        self.seen = set()
+        self.rows = self.done = self.created = self.skipped = 0
+        self.started = time.monotonic()
+        # Fork the hashing pool before this process opens a database connection
+        connection.close()
+        context = multiprocessing.get_context('fork')
+        with context.Pool(options['processes']) as pool:
+            pending = deque()
+            rows = enumerate(read_rows(options['path'], options['format']), start=1)
+            while True:
+                chunk = list(islice(rows, options['batch_size']))
+                if not chunk:
+                    break
+                users, passwords = self.prepare(chunk)
+                # Hash the next batches while earlier ones are being inserted
+                hashed = pool.apply_async(hash_passwords, ([password for _, password in passwords],))
+                pending.append((len(chunk), users, passwords, hashed))
+                if len(pending) > options['processes']:
+                    self.insert(*pending.popleft())
+            while pending:
+                self.insert(*pending.popleft())
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {self.created} of {self.rows} rows ({self.skipped} skipped) in {elapsed:.2f}s "
+            f"({self.rows / elapsed if elapsed else 0:.0f} rows/s)"
+        ))
+    
+    def prepare(self, chunk):
+        """Build users for a batch, dropping bad rows and emails or usernames already taken"""
+        users = []
+        for number, row in chunk:
+            self.rows += 1
+            try:
+                user, password = build_user(row)
+            except ImportRowError as e:
+                self.skip(number, str(e))
+                continue
+            if user.email in self.seen or user.username in self.seen:
+                self.skip(number, 'duplicate email or username in the file')
+                continue
+            self.seen.update((user.email, user.username))
+            users.append((number, user, password))
+        taken = set()
+        for email, username in User.objects.filter(
+            Q(email__in=[user.email for _, user, _ in users]) | Q(username__in=[user.username for _, user, _ in users])
+        ).values_list('email', 'username'):
+            taken.update((email, username))
+        kept = []
+        passwords = []
+        for number, user, password in users:
+            if user.email in taken or user.username in taken:
+                self.skip(number, 'email or username already registered')
+                continue
+            if password is not None:
+                passwords.append((len(kept), password))
+            kept.append(user)
+        return kept, passwords
+    
+    def insert(self, rows, users, passwords, hashed):
+        for (index, _), password_hash in zip(passwords, hashed.get()):
+            users[index].password = password_hash
+        if users:
+            with transaction.atomic():
+                save_users(users)
+        # Rows read ahead into the hashing pipeline aren't counted until inserted
+        self.done += rows
+        self.created += len(users)
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(f"{self.done} rows done, {self.created} users created ({self.done / elapsed:.0f} rows/s)")
+    
+    def skip(self, number, reason):
+        self.skipped += 1
+        self.stderr.write(f"Row {number}: {reason}")
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from accounts.blacklist import prune_blacklist
+
+class Command(BaseCommand):
+    help = 'Delete blacklisted refresh tokens that have expired'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement')
+        parser.add_argument('--interval', type=int, default=0, help='Keep pruning every N seconds instead of running once')
+    
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            count = prune_blacklist(batch_size=options['batch_size'])
+            elapsed = time.monotonic() - started
+            if count or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f"Pruned {count} expired tokens in {elapsed:.2f}s"))
+            if not options['interval']:
+                return
+            connection.close()
+            time.sleep(options['interval'])
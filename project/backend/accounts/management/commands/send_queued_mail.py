@@ -0,0 +1,49 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from accounts.mail import deliver_batch, get_delivery_connection
+
+MAX_CONSECUTIVE_ERRORS = 5
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox emails in batches over one reused mail connection'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Emails claimed and sent per batch')
+        parser.add_argument('--interval', type=float, default=0, help='Keep polling every N seconds instead of draining once')
+    
+    def handle(self, *args, **options):
+        mail_connection = get_delivery_connection()
+        totals = [0, 0, 0]
+        errors = 0
+        started = time.monotonic()
+        try:
+            while True:
+                try:
+                    counts = deliver_batch(mail_connection, batch_size=options['batch_size'])
+                except DatabaseError as e:
+                    # The claim rolled back and the emails stay pending; back off and retry
+                    errors += 1
+                    self.stderr.write(str(e))
+                    if errors >= MAX_CONSECUTIVE_ERRORS:
+                        raise CommandError(f'Giving up after {errors} database errors')
+                    connection.close()
+                    time.sleep(errors)
+                    continue
+                errors = 0
+                totals = [total + count for total, count in zip(totals, counts)]
+                if any(counts):
+                    continue
+                # Nothing due: don't hold the mail server connection while idle
+                mail_connection.close()
+                if not options['interval']:
+                    break
+                connection.close()
+                time.sleep(options['interval'])
+        finally:
+            mail_connection.close()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {totals[0]} emails ({totals[1]} to retry, {totals[2]} failed) in {elapsed:.2f}s "
+            f"({totals[0] / elapsed if elapsed else 0:.0f}/s)"
+        ))
@@ -0,0 +1,91 @@
+import random
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+from django.core.management.base import BaseCommand
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept what smtplib sends, discarding the messages"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            number = server.connections
+        accepted = 0
+        self.reply('220 localhost SMTP sink ready')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            verb = line.decode('utf-8', 'replace').strip().split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250-8BITMIME')
+                self.reply('250 AUTH PLAIN')
+            elif verb == 'AUTH':
+                self.reply('235 Authentication successful')
+            elif verb in ('HELO', 'MAIL', 'RCPT', 'RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = b''.join(iter(lambda: self.rfile.readline(), b'.\r\n'))
+                if server.delay:
+                    time.sleep(server.delay)
+                if random.random() < server.reject_rate:
+                    self.reply('451 Try again later')
+                    continue
+                accepted += 1
+                with server.lock:
+                    server.messages += 1
+                if server.verbose:
+                    message = message_from_bytes(data)
+                    server.command.stdout.write(f"#{number} {message['To']}: {message['Subject']}")
+                self.reply('250 Message accepted')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                break
+            else:
+                self.reply('502 Command not implemented')
+        server.command.stdout.write(
+            f"Connection {number} closed after {accepted} messages ({server.messages} in total)"
+        )
+
+class SinkServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+class Command(BaseCommand):
+    help = (
+        'Run a local SMTP server that accepts and discards mail, for exercising the outbox worker '
+        '(point EMAIL_HOST/EMAIL_PORT at it with EMAIL_USE_TLS=False)'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=1025)
+        parser.add_argument('--delay', type=float, default=0, help='Seconds to stall before accepting each message')
+        parser.add_argument('--reject-rate', type=float, default=0, help='Fraction of messages answered with 451')
+        parser.add_argument('--verbose', action='store_true', help='Print the recipients and subject of each message')
+    
+    def handle(self, *args, **options):
+        server = SinkServer((options['host'], options['port']), SinkHandler)
+        server.lock = threading.Lock()
+        server.connections = 0
+        server.messages = 0
+        server.delay = options['delay']
+        server.reject_rate = options['reject_rate']
+        server.verbose = options['verbose']
+        server.command = self
+        self.stdout.write(f"SMTP sink listening on {options['host']}:{options['port']}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        self.stdout.write(f"Accepted {server.messages} messages over {server.connections} connections")
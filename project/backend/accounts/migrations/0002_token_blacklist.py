@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-17 23:03
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlacklistedToken',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('jti', models.CharField(max_length=255, unique=True)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Blacklisted Token',
+                'verbose_name_plural': 'Blacklisted Tokens',
+                'db_table': 'token_blacklist',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['expires_at'], name='token_black_expires_07a99b_idx'), models.Index(fields=['created_at'], name='token_black_created_35fe2d_idx')],
+            },
+        ),
+    ]
@@ -76,4 +76,64 @@ class UserProfile(models.Model):
         verbose_name_plural = 'User Profiles'
     
     def __str__(self):
-        return f"{self.user.full_name}'s Profile"
\ No newline at end of file
+        return f"{self.user.full_name}'s Profile"
+
+class BlacklistedToken(models.Model):
+    """Revoked refresh token, kept until the token would have expired anyway"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'token_blacklist'
+        verbose_name = 'Blacklisted Token'
+        verbose_name_plural = 'Blacklisted Tokens'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['expires_at']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return self.jti
+
+class OutboundEmail(models.Model):
+    """Email waiting in the outbox for the mail worker to deliver"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    subject = models.TextField()
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'email_outbox'
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
@@ -2,7 +2,9 @@ from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
 from .models import User, UserProfile
+from .tokens import RefreshToken
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """Serializer for user registration"""
@@ -130,4 +132,8 @@ class AdminUserSerializer(serializers.ModelSerializer):
             'full_name', 'phone', 'role', 'is_active', 'is_email_verified',
             'last_login', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'email', 'created_at', 'updated_at', 'last_login']
\ No newline at end of file
+        read_only_fields = ['id', 'email', 'created_at', 'updated_at', 'last_login']
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Token refresh that checks and rotates through the token blacklist"""
+    token_class = RefreshToken
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .authentication import invalidate_user
+from .models import User
+
+# Saves that don't change anything authentication depends on
+UNCACHED_USER_FIELDS = {'last_login'}
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= UNCACHED_USER_FIELDS:
+        return
+    invalidate_user(str(instance.pk))
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_user(str(instance.pk))
@@ -2,16 +2,16 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.utils import timezone
 from django.db.models import Q
+from .activity import last_login_writer
 from .models import User, UserProfile
+from .tokens import RefreshToken
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer,
     UserProfileUpdateSerializer, ChangePasswordSerializer, UserProfileDetailSerializer,
@@ -72,9 +72,8 @@ class UserLoginView(APIView):
         if serializer.is_valid():
             user = serializer.validated_data['user']
             
-            # Update last login
-            user.last_login = timezone.now()
-            user.save(update_fields=['last_login'])
+            # Update last login (buffered and written in batches)
+            last_login_writer.record(user)
             
             # Generate tokens
             refresh = RefreshToken.for_user(user)
@@ -101,9 +101,113 @@ DATABASES = {
 #     }
 # }
 
+# Cache Configuration
+# Set CATALOG_CACHE_BACKEND to django.core.cache.backends.redis.RedisCache (with
+# CATALOG_CACHE_LOCATION=redis://...) to share cached catalog responses between workers
+CATALOG_CACHE_BACKEND = config('CATALOG_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='bijoushop-default'),
+    },
+    'catalog': {
+        'BACKEND': CATALOG_CACHE_BACKEND,
+        'LOCATION': config('CATALOG_CACHE_LOCATION', default='bijoushop-catalog'),
+    },
+}
+
+if CATALOG_CACHE_BACKEND.endswith('LocMemCache'):
+    CACHES['catalog']['OPTIONS'] = {'MAX_ENTRIES': 5000}
+
+CATALOG_CACHE_ALIAS = 'catalog'
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+
+# Seconds to cache facet counts per filter signature (0 disables)
+PRODUCT_FACETS_CACHE_TIMEOUT = config('PRODUCT_FACETS_CACHE_TIMEOUT', default=300, cast=int)
+PRODUCT_FACET_PRICE_BUCKETS = [500, 1000, 2500, 5000, 10000]
+
+# Serve catalog listings from the denormalized product_cards table, optionally
+# rendering rows without the DRF serializer
+PRODUCT_CARD_READ_MODEL = config('PRODUCT_CARD_READ_MODEL', default=False, cast=bool)
+PRODUCT_CARD_SERIALIZER_BYPASS = config('PRODUCT_CARD_SERIALIZER_BYPASS', default=False, cast=bool)
+
+CATEGORY_TREE_CACHE_TIMEOUT = config('CATEGORY_TREE_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Product view counts are buffered per worker and flushed after this many
+# seconds or once this many views are pending
+VIEW_COUNT_FLUSH_INTERVAL = config('VIEW_COUNT_FLUSH_INTERVAL', default=10, cast=int)
+VIEW_COUNT_FLUSH_THRESHOLD = config('VIEW_COUNT_FLUSH_THRESHOLD', default=100, cast=int)
+
+# Seconds checkout holds stock for an unpaid order before the expiry sweeper
+# (manage.py expire_reservations) gives it back; 0 sells stock at checkout
+STOCK_RESERVATION_TTL = config('STOCK_RESERVATION_TTL', default=0, cast=int)
+
+# Seconds each worker caches a coupon looked up by code. Saving or deleting a
+# coupon bumps its version in the catalog cache, which invalidates every
+# worker straight away only when CATALOG_CACHE_BACKEND is shared (e.g. Redis);
+# with the default LocMemCache coupons are read from the database each time
+COUPON_CACHE_TIMEOUT = config('COUPON_CACHE_TIMEOUT', default=60, cast=int)
+
+# Pricing rules: tax as a fraction of the discounted subtotal (e.g. 0.16), a
+# flat shipping fee waived from the given subtotal (0 never waives it), and
+# how long a computed cart quote is reused
+ORDER_TAX_RATE = config('ORDER_TAX_RATE', default='0')
+ORDER_SHIPPING_FEE = config('ORDER_SHIPPING_FEE', default='0')
+ORDER_FREE_SHIPPING_MINIMUM = config('ORDER_FREE_SHIPPING_MINIMUM', default='0')
+PRICING_QUOTE_TIMEOUT = config('PRICING_QUOTE_TIMEOUT', default=300, cast=int)
+
+# Completed orders untouched for this many days are moved to the archive
+# tables by manage.py archive_orders
+ORDER_ARCHIVE_AFTER_DAYS = config('ORDER_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+
+# Seconds each worker reuses an authenticated user before reloading it; saving
+# or deactivating the user invalidates it at once through a version in the
+# AUTH_USER_CACHE_ALIAS cache. That cache must be shared between workers
+# (e.g. Redis); with a process-local backend such as the default LocMemCache
+# users are read from the database on every request. AUTH_USER_CACHE_SHARED
+# also keeps the users themselves in that cache for cold workers.
+AUTH_USER_CACHE_ALIAS = 'default'
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=30, cast=int)
+AUTH_USER_CACHE_SHARED = config('AUTH_USER_CACHE_SHARED', default=False, cast=bool)
+
+# last_login is buffered per worker and written in one batch after this many
+# seconds or once this many users are pending (0 writes on every login)
+LAST_LOGIN_FLUSH_INTERVAL = config('LAST_LOGIN_FLUSH_INTERVAL', default=60, cast=int)
+LAST_LOGIN_FLUSH_THRESHOLD = config('LAST_LOGIN_FLUSH_THRESHOLD', default=500, cast=int)
+
+# Revoked refresh tokens are screened by an in-memory bloom filter sized for
+# this many tokens at this false positive rate, loaded on first use and rebuilt
+# from the database every TOKEN_BLACKLIST_REBUILD_INTERVAL seconds. Needs a
+# shared AUTH_USER_CACHE_ALIAS backend; with LocMemCache every refresh checks
+# the token_blacklist table instead.
+TOKEN_BLACKLIST_BLOOM_CAPACITY = config('TOKEN_BLACKLIST_BLOOM_CAPACITY', default=100000, cast=int)
+TOKEN_BLACKLIST_BLOOM_ERROR_RATE = config('TOKEN_BLACKLIST_BLOOM_ERROR_RATE', default=0.001, cast=float)
+TOKEN_BLACKLIST_REBUILD_INTERVAL = config('TOKEN_BLACKLIST_REBUILD_INTERVAL', default=3600, cast=int)
+
+# Order number scheme; every live process needs its own node id. Unless
+# ORDER_NUMBER_NODE_ID is set (one process per value), ids are leased for
+# ORDER_NUMBER_NODE_LEASE seconds at a time from ORDER_NUMBER_NODE_CACHE_ALIAS,
+# which should be a shared cache outside DEBUG (system check orders.W001)
+ORDER_NUMBER_GENERATOR = 'orders.order_numbers.SequentialOrderNumberGenerator'
+ORDER_NUMBER_NODE_ID = config('ORDER_NUMBER_NODE_ID', default=None, cast=lambda v: None if v in (None, '') else int(v))
+ORDER_NUMBER_NODE_CACHE_ALIAS = 'default'
+ORDER_NUMBER_NODE_LEASE = config('ORDER_NUMBER_NODE_LEASE', default=300, cast=int)
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
+# Django's default hashers, plus salted SHA-256 hashes imported from the
+# legacy store (upgraded to PBKDF2 on first login)
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'accounts.hashers.LegacySHA256PasswordHasher',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -141,7 +245,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -164,7 +268,8 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=config('JWT_REFRESH_TOKEN_LIFETIME', default=7, cast=int)),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    # UserLoginView records last_login through accounts.activity.last_login_writer
+    'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': config('JWT_ALGORITHM', default='HS256'),
     'SIGNING_KEY': config('JWT_SECRET_KEY', default=SECRET_KEY),
     'VERIFYING_KEY': None,
@@ -172,6 +277,8 @@ SIMPLE_JWT = {
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    # Rotated refresh tokens go to accounts.blacklist rather than simplejwt's token_blacklist app
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
 }
 
 # CORS Configuration
@@ -188,7 +295,12 @@ CORS_ALLOW_ALL_ORIGINS = DEBUG  # Only in development
 # )
 
 # Email Configuration
-EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+# The EMAIL_BACKEND env var still names the real transport (console, smtp, ...)
+# but is used as EMAIL_DELIVERY_BACKEND by the send_queued_mail worker;
+# send_mail() queues into the email_outbox table unless EMAIL_OUTBOX=False
+EMAIL_DELIVERY_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_OUTBOX = config('EMAIL_OUTBOX', default=True, cast=bool)
+EMAIL_BACKEND = 'accounts.mail.OutboxEmailBackend' if EMAIL_OUTBOX else EMAIL_DELIVERY_BACKEND
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
@@ -196,6 +308,14 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@eliteshop.com')
 
+# Outbox delivery retries: up to EMAIL_OUTBOX_MAX_ATTEMPTS sends, waiting
+# EMAIL_OUTBOX_RETRY_DELAY seconds and doubling (capped) between them; emails
+# claimed by a worker that died are picked up again after the lock timeout
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config('EMAIL_OUTBOX_RETRY_DELAY', default=60, cast=int)
+EMAIL_OUTBOX_MAX_RETRY_DELAY = config('EMAIL_OUTBOX_MAX_RETRY_DELAY', default=3600, cast=int)
+EMAIL_OUTBOX_LOCK_TIMEOUT = config('EMAIL_OUTBOX_LOCK_TIMEOUT', default=600, cast=int)
+
 # Celery Configuration
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('REDIS_URL', default='redis://localhost:6379/0')
@@ -208,6 +328,7 @@ CELERY_TIMEZONE = TIME_ZONE
 STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
 STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
+STRIPE_WEBHOOK_TOLERANCE = config('STRIPE_WEBHOOK_TOLERANCE', default=300, cast=int)
 
 # M-Pesa Configuration
 MPESA_CONSUMER_KEY = config('MPESA_CONSUMER_KEY', default='')
@@ -215,6 +336,9 @@ MPESA_CONSUMER_SECRET = config('MPESA_CONSUMER_SECRET', default='')
 MPESA_SHORTCODE = config('MPESA_SHORTCODE', default='174379')
 MPESA_PASSKEY = config('MPESA_PASSKEY', default='')
 MPESA_CALLBACK_URL = config('MPESA_CALLBACK_URL', default='')
+# Shared secret expected as ?token= on the callback URL (M-Pesa doesn't sign callbacks);
+# callbacks are rejected while it is unset unless DEBUG is on
+MPESA_CALLBACK_TOKEN = config('MPESA_CALLBACK_TOKEN', default='')
 
 # Security Settings for Production
 if not DEBUG:
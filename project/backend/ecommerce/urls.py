@@ -37,6 +37,8 @@ def api_root(request):
                 'change_password': '/api/auth/change-password/',
             },
             'products': '/api/products/',
+            'cart': '/api/orders/cart/',
+            'orders': '/api/orders/',
             'admin': '/admin/',
         }
     }, status=status.HTTP_200_OK)
@@ -57,7 +59,7 @@ urlpatterns = [
     # API routes
     path('api/auth/', include('accounts.urls')),
     path('api/products/', include('products.urls')),
-    # path('api/orders/', include('orders.urls')),  # URLs file doesn't exist yet
+    path('api/orders/', include('orders.urls')),
     # path('api/payments/', include('payments.urls')),  # App doesn't exist yet
     # path('api/analytics/', include('analytics.urls')),  # App doesn't exist yet
 ]
@@ -0,0 +1,93 @@
+from django.contrib import admin
+from .models import ArchivedOrder, ArchivedOrderItem, Coupon, Order, OrderItem, OrderStatusHistory
+from .transitions import bulk_transition
+
+class OrderItemInline(admin.TabularInline):
+    """Order Item Inline"""
+    model = OrderItem
+    extra = 0
+    fields = ('product', 'product_name', 'product_price', 'quantity', 'total_price')
+    readonly_fields = fields
+    can_delete = False
+
+class OrderStatusHistoryInline(admin.TabularInline):
+    """Order Status History Inline"""
+    model = OrderStatusHistory
+    extra = 0
+    fields = ('status', 'notes', 'changed_by', 'created_at')
+    readonly_fields = fields
+    can_delete = False
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    """Order Admin"""
+    list_display = ('order_number', 'user', 'status', 'payment_status', 'payment_method', 'total_amount', 'created_at')
+    list_filter = ('status', 'payment_status', 'payment_method', 'created_at')
+    search_fields = ('order_number', 'user__email', 'shipping_name', 'tracking_number')
+    list_select_related = ('user',)
+    raw_id_fields = ('user', 'coupon')
+    readonly_fields = ('order_number', 'created_at', 'updated_at')
+    inlines = [OrderItemInline, OrderStatusHistoryInline]
+    
+    actions = ['mark_confirmed', 'mark_processing', 'mark_shipped', 'mark_delivered', 'mark_cancelled']
+    
+    def transition(self, request, queryset, new_status):
+        updated, rejected = bulk_transition(queryset, new_status, changed_by=request.user)
+        self.message_user(request, f"{len(updated)} orders marked {new_status}")
+        if rejected:
+            self.message_user(
+                request,
+                f"{len(rejected)} orders skipped: {', '.join(sorted(rejected)[:10])}",
+                level='warning'
+            )
+    
+    def mark_confirmed(self, request, queryset):
+        self.transition(request, queryset, 'confirmed')
+    mark_confirmed.short_description = "Mark selected orders confirmed"
+    
+    def mark_processing(self, request, queryset):
+        self.transition(request, queryset, 'processing')
+    mark_processing.short_description = "Mark selected orders processing"
+    
+    def mark_shipped(self, request, queryset):
+        self.transition(request, queryset, 'shipped')
+    mark_shipped.short_description = "Mark selected orders shipped"
+    
+    def mark_delivered(self, request, queryset):
+        self.transition(request, queryset, 'delivered')
+    mark_delivered.short_description = "Mark selected orders delivered"
+    
+    def mark_cancelled(self, request, queryset):
+        self.transition(request, queryset, 'cancelled')
+    mark_cancelled.short_description = "Cancel selected orders"
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    """Archived Order Item Inline"""
+    model = ArchivedOrderItem
+    extra = 0
+    fields = ('product', 'product_name', 'product_price', 'quantity', 'total_price')
+    readonly_fields = fields
+    can_delete = False
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    """Archived Order Admin (read only)"""
+    list_display = ('order_number', 'user', 'status', 'payment_status', 'total_amount', 'created_at')
+    list_filter = ('status', 'payment_status', 'created_at')
+    search_fields = ('order_number', 'user__email')
+    list_select_related = ('user',)
+    inlines = [ArchivedOrderItemInline]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(Coupon)
+class CouponAdmin(admin.ModelAdmin):
+    """Coupon Admin"""
+    list_display = ('code', 'type', 'value', 'used_count', 'usage_limit', 'valid_from', 'valid_until', 'is_active')
+    list_filter = ('type', 'is_active', 'valid_from', 'valid_until')
+    search_fields = ('code',)
+    readonly_fields = ('used_count', 'created_at', 'updated_at')
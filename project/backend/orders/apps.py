@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+class OrdersConfig(AppConfig):
+    """Orders app configuration"""
+    name = 'orders'
+    
+    def ready(self):
+        # Register cache invalidation signal handlers
+        from . import signals  # noqa: F401
+        from . import checks  # noqa: F401
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import (
+    ArchivedOrder, ArchivedOrderItem, ArchivedOrderStatusHistory, Order, OrderItem, OrderStatusHistory,
+)
+
+# Orders in these statuses don't change any more and can leave the hot tables
+ARCHIVE_STATUSES = ['delivered', 'cancelled', 'refunded']
+
+# (hot model, archive model, column holding the order id)
+ARCHIVE_TABLES = [
+    (Order, ArchivedOrder, 'id'),
+    (OrderItem, ArchivedOrderItem, 'order_id'),
+    (OrderStatusHistory, ArchivedOrderStatusHistory, 'order_id'),
+]
+
+def archive_cutoff(days=None):
+    days = days if days is not None else getattr(settings, 'ORDER_ARCHIVE_AFTER_DAYS', 365)
+    return timezone.now() - timedelta(days=days)
+
+def archivable_orders(cutoff):
+    """Completed orders last changed before cutoff"""
+    return Order.objects.filter(status__in=ARCHIVE_STATUSES, updated_at__lt=cutoff)
+
+def _copy_rows(hot_model, archive_model, column, order_ids):
+    columns = ', '.join(
+        connection.ops.quote_name(field.column) for field in archive_model._meta.concrete_fields
+    )
+    placeholders = ', '.join(['%s'] * len(order_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {connection.ops.quote_name(archive_model._meta.db_table)} ({columns}) '
+            f'SELECT {columns} FROM {connection.ops.quote_name(hot_model._meta.db_table)} '
+            f'WHERE {connection.ops.quote_name(column)} IN ({placeholders})',
+            order_ids,
+        )
+
+def archive_batch(cutoff, batch_size=500):
+    """
+    Move one batch of archivable orders, with their items and status history,
+    into the archive tables; returns the number of orders moved.
+
+    Rows are copied with INSERT ... SELECT and deleted from the hot tables in
+    the same transaction, so readers see each order in exactly one place.
+    """
+    with transaction.atomic():
+        order_ids = list(
+            archivable_orders(cutoff)
+            .order_by('updated_at')
+            .select_for_update(skip_locked=True)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not order_ids:
+            return 0
+        db_ids = [Order._meta.pk.get_db_prep_value(pk, connection) for pk in order_ids]
+        for hot_model, archive_model, column in ARCHIVE_TABLES:
+            _copy_rows(hot_model, archive_model, column, db_ids)
+        # Cascades to items, history and finished stock reservations
+        Order.objects.filter(pk__in=order_ids).delete()
+    return len(order_ids)
+
+def archive_orders(cutoff=None, batch_size=500):
+    """Archive every completed order older than cutoff in chunked transactions"""
+    cutoff = cutoff or archive_cutoff()
+    total = 0
+    while True:
+        count = archive_batch(cutoff, batch_size)
+        total += count
+        if count < batch_size:
+            return total
@@ -0,0 +1,154 @@
+import uuid
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import F, DecimalField, ExpressionWrapper, OuterRef, Subquery
+from django.utils import timezone
+from products.models import Product, ProductImage
+from .models import Cart
+
+MAX_CART_LINES = 100
+
+class CartError(Exception):
+    """Raised when a cart change can't be applied"""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or {}
+
+def cart_lines(user):
+    """Priced cart lines and totals from one joined query"""
+    primary_image = ProductImage.objects.filter(
+        product=OuterRef('product_id'), is_primary=True
+    ).order_by('sort_order', 'created_at').values('image_url')[:1]
+    rows = (
+        Cart.objects.filter(user=user)
+        .annotate(
+            product_name=F('product__name'),
+            product_slug=F('product__slug'),
+            product_images=F('product__images'),
+            primary_image_url=Subquery(primary_image),
+            unit_price=F('product__price'),
+            stock_quantity=F('product__stock_quantity'),
+            is_active=F('product__is_active'),
+            line_total=ExpressionWrapper(
+                F('quantity') * F('product__price'),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+        )
+        .values(
+            'id', 'product_id', 'product_name', 'product_slug', 'product_images', 'primary_image_url',
+            'unit_price', 'quantity', 'line_total', 'stock_quantity', 'is_active', 'updated_at',
+        )
+        .order_by('-created_at')
+    )
+    items = []
+    subtotal = Decimal('0.00')
+    item_count = 0
+    for row in rows:
+        images = row.pop('product_images') or []
+        primary_image_url = row.pop('primary_image_url')
+        row['primary_image'] = images[0] if images else primary_image_url
+        row['line_total'] = Decimal(row['line_total']).quantize(Decimal('0.01'))
+        row['is_available'] = row.pop('is_active') and row['stock_quantity'] >= row['quantity']
+        subtotal += row['line_total']
+        item_count += row['quantity']
+        items.append(row)
+    return {
+        'items': items,
+        'line_count': len(items),
+        'item_count': item_count,
+        'subtotal': subtotal,
+    }
+
+def _load_products(product_ids):
+    products = dict(
+        Product.objects.filter(pk__in=product_ids, is_active=True).values_list('pk', 'stock_quantity')
+    )
+    missing = [str(pk) for pk in product_ids if pk not in products]
+    if missing:
+        raise CartError('Some products are not available', {'products': missing})
+    return products
+
+def _merge_lines(lines):
+    """Collapse duplicate products in one request, summing their quantities"""
+    merged = {}
+    for line in lines:
+        merged[line['product']] = merged.get(line['product'], 0) + line['quantity']
+    if len(merged) > MAX_CART_LINES:
+        raise CartError(f'A cart can hold at most {MAX_CART_LINES} different products')
+    return merged
+
+def _check_stock(quantities, stock):
+    short = {
+        str(pk): stock[pk]
+        for pk, quantity in quantities.items()
+        if quantity > stock[pk]
+    }
+    if short:
+        raise CartError('Not enough stock for some products', {'available': short})
+
+def _upsert(user, quantities):
+    Cart.objects.bulk_create(
+        [Cart(user=user, product_id=pk, quantity=quantity) for pk, quantity in quantities.items()],
+        update_conflicts=True,
+        unique_fields=['user', 'product'],
+        update_fields=['quantity', 'updated_at'],
+    )
+
+def _db_value(field_name, value):
+    return Cart._meta.get_field(field_name).get_db_prep_value(value, connection)
+
+ADD_ITEMS_SQL = """
+INSERT INTO cart_items (id, user_id, product_id, quantity, created_at, updated_at)
+VALUES {values}
+ON CONFLICT (user_id, product_id) DO UPDATE
+SET quantity = cart_items.quantity + EXCLUDED.quantity, updated_at = EXCLUDED.updated_at
+"""
+
+def _add_quantities(user, added):
+    """Insert new lines and add to existing ones in one statement, so concurrent adds both count"""
+    now = _db_value('created_at', timezone.now())
+    user_id = _db_value('user', user.pk)
+    params = []
+    for pk, quantity in added.items():
+        params.extend([_db_value('id', uuid.uuid4()), user_id, _db_value('product', pk), quantity, now, now])
+    values = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(added))
+    with connection.cursor() as cursor:
+        cursor.execute(ADD_ITEMS_SQL.format(values=values), params)
+
+def add_items(user, lines):
+    """Add quantities to the cart, creating lines as needed"""
+    added = _merge_lines(lines)
+    with transaction.atomic():
+        stock = _load_products(list(added))
+        _add_quantities(user, added)
+        # Checked after the write so an add racing with this one is counted too
+        quantities = dict(
+            Cart.objects.filter(user=user, product_id__in=list(added)).values_list('product_id', 'quantity')
+        )
+        _check_stock(quantities, stock)
+
+def set_items(user, lines):
+    """Set line quantities; a quantity of 0 removes the line"""
+    quantities = {}
+    for line in lines:
+        quantities[line['product']] = line['quantity']
+    if len(quantities) > MAX_CART_LINES:
+        raise CartError(f'A cart can hold at most {MAX_CART_LINES} different products')
+    removed = [pk for pk, quantity in quantities.items() if quantity == 0]
+    kept = {pk: quantity for pk, quantity in quantities.items() if quantity > 0}
+    with transaction.atomic():
+        if kept:
+            stock = _load_products(list(kept))
+            _check_stock(kept, stock)
+            _upsert(user, kept)
+        if removed:
+            Cart.objects.filter(user=user, product_id__in=removed).delete()
+
+def remove_items(user, product_ids=None):
+    """Remove the given products, or empty the cart when none are given"""
+    lines = Cart.objects.filter(user=user)
+    if product_ids:
+        lines = lines.filter(product_id__in=product_ids)
+    lines.delete()
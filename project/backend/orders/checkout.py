@@ -0,0 +1,106 @@
+from django.db import transaction
+from .cart import CartError
+from .coupons import CouponError, redeem_coupon
+from .models import Cart, Coupon, Order, OrderItem, OrderStatusHistory, StockReservation
+from .pricing import quote_lines
+from .reservations import reservation_ttl, release_reservations, reserve_stock
+from .stock import decrement_stock
+
+class CheckoutError(CartError):
+    """Raised when a cart can't be turned into an order"""
+
+def snapshot_cart(user):
+    """Name and price snapshot of every cart line, from one joined query"""
+    return list(
+        Cart.objects.filter(user=user)
+        .order_by('created_at')
+        .values_list('product_id', 'quantity', 'product__name', 'product__price', 'product__is_active')
+    )
+
+def checkout(user, coupon_code=None, **order_fields):
+    """
+    Turn the user's cart into an order in a single transaction.
+
+    order_fields are Order fields such as payment_method and the shipping
+    address. Items are written with one bulk insert, stock is decremented
+    with set-based conditional UPDATEs (or held, when STOCK_RESERVATION_TTL
+    is set) and the ordered lines are removed from the cart. Totals come
+    from the pricing engine's quote, usually already cached by the cart
+    page, and a coupon is redeemed with a conditional UPDATE as the last
+    statement.
+    """
+    lines = snapshot_cart(user)
+    if not lines:
+        raise CheckoutError('Your cart is empty')
+    unavailable = [str(product_id) for product_id, _, _, _, is_active in lines if not is_active]
+    if unavailable:
+        raise CheckoutError('Some products are not available', {'products': unavailable})
+
+    quote = quote_lines(
+        ((product_id, quantity, price) for product_id, quantity, _, price, _ in lines), coupon_code
+    )
+    if quote['coupon_error']:
+        raise CheckoutError(quote['coupon_error'], {'coupon_code': [quote['coupon_error']]})
+    order_fields.update(
+        subtotal=quote['subtotal'],
+        discount_amount=quote['discount_amount'],
+        tax_amount=quote['tax_amount'],
+        shipping_amount=quote['shipping_amount'],
+        total_amount=quote['total_amount'],
+        coupon_id=quote['coupon_id'],
+    )
+    quantities = {product_id: quantity for product_id, quantity, _, _, _ in lines}
+
+    if reservation_ttl():
+        return _checkout_with_holds(user, lines, quantities, order_fields)
+
+    with transaction.atomic():
+        order = _create_order(user, lines, order_fields)
+        # Stock rows are locked from here until commit, so this runs last
+        decrement_stock(quantities)
+        Cart.objects.filter(user=user, product_id__in=list(quantities)).delete()
+        _redeem(order)
+    return order
+
+def _checkout_with_holds(user, lines, quantities, order_fields):
+    """
+    Hold the stock first in its own short transaction, then write the order
+    and attach the holds to it; confirm_reservations() makes them permanent
+    on payment and the expiry sweeper gives unpaid stock back.
+    """
+    holds = reserve_stock(quantities, user=user)
+    hold_ids = [hold.pk for hold in holds]
+    try:
+        with transaction.atomic():
+            order = _create_order(user, lines, order_fields)
+            StockReservation.objects.filter(pk__in=hold_ids).update(order=order)
+            Cart.objects.filter(user=user, product_id__in=list(quantities)).delete()
+            _redeem(order)
+    except Exception:
+        release_reservations(StockReservation.objects.filter(pk__in=hold_ids))
+        raise
+    return order
+
+def _create_order(user, lines, order_fields):
+    order = Order.objects.create(user=user, **order_fields)
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            product_id=product_id,
+            product_name=name,
+            product_price=price,
+            quantity=quantity,
+            total_price=price * quantity,
+        )
+        for product_id, quantity, name, price, _ in lines
+    ])
+    OrderStatusHistory.objects.create(order=order, status=order.status, changed_by=user)
+    return order
+
+def _redeem(order):
+    if order.coupon_id is None:
+        return
+    try:
+        redeem_coupon(Coupon(pk=order.coupon_id))
+    except CouponError as e:
+        raise CheckoutError(e.message, {'coupon_code': [e.message]})
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.utils.module_loading import import_string
+from products.response_cache import is_process_local
+from .order_numbers import DEFAULT_GENERATOR, SequentialOrderNumberGenerator, get_node_cache
+
+@register()
+def check_order_number_nodes(app_configs, **kwargs):
+    """Sequential order numbers need a node id per process outside development"""
+    generator = import_string(getattr(settings, 'ORDER_NUMBER_GENERATOR', DEFAULT_GENERATOR))
+    if (
+        settings.DEBUG
+        or not issubclass(generator, SequentialOrderNumberGenerator)
+        or getattr(settings, 'ORDER_NUMBER_NODE_ID', None) is not None
+        or not is_process_local(get_node_cache())
+    ):
+        return []
+    return [Warning(
+        'Order number node ids come from process ids, which can repeat between workers; '
+        'clashes are only caught by the retry in Order.save.',
+        hint=(
+            'Point ORDER_NUMBER_NODE_CACHE_ALIAS at a shared cache such as Redis, or set '
+            'ORDER_NUMBER_NODE_ID when each configured value runs a single process.'
+        ),
+        id='orders.W001',
+    )]
@@ -0,0 +1,111 @@
+import threading
+import time
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from products.response_cache import get_cache, get_versions, is_process_local
+from .models import Coupon
+
+class CouponError(Exception):
+    """Raised when a coupon code can't be applied"""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+class CouponCache:
+    """
+    Per-process cache of coupons by code, unknown codes included.
+
+    Entries are dropped whenever the Coupon version in the catalog cache
+    moves (bumped on save and delete) and after COUPON_CACHE_TIMEOUT seconds.
+    That only reaches every worker when the catalog cache is shared; with a
+    process-local backend coupons are always read from the database.
+    used_count is deliberately not trusted from here; redemption checks it
+    in the UPDATE.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.version = None
+        self.lock = threading.Lock()
+
+    def get(self, code):
+        code = normalize_code(code)
+        if is_process_local(get_cache()):
+            # Other workers' saves can't reach this process's version
+            return Coupon.objects.filter(code__iexact=code).first()
+        version = get_versions([Coupon])[0]
+        now = time.monotonic()
+        with self.lock:
+            if version != self.version:
+                self.entries = {}
+                self.version = version
+            entry = self.entries.get(code)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        coupon = Coupon.objects.filter(code__iexact=code).first()
+        with self.lock:
+            if version == self.version:
+                self.entries[code] = (now + getattr(settings, 'COUPON_CACHE_TIMEOUT', 60), coupon)
+        return coupon
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+
+coupon_cache = CouponCache()
+
+def normalize_code(code):
+    return code.strip().upper()
+
+def _check_valid(coupon, now):
+    if coupon is None or not coupon.is_active:
+        raise CouponError('Invalid coupon code')
+    if not coupon.valid_from <= now <= coupon.valid_until:
+        raise CouponError('This coupon has expired' if now > coupon.valid_until else 'This coupon is not active yet')
+
+def coupon_discount(coupon, amount, now=None):
+    """
+    Discount the coupon gives on amount, raising CouponError when it doesn't
+    apply. Mirrors Coupon.calculate_discount minus the usage check.
+    """
+    now = now or timezone.now()
+    _check_valid(coupon, now)
+    if coupon.minimum_amount and amount < coupon.minimum_amount:
+        raise CouponError(f'This coupon needs a minimum order of {coupon.minimum_amount}')
+
+    if coupon.type == 'percentage':
+        discount = (amount * coupon.value) / 100
+    else:  # fixed_amount
+        discount = coupon.value
+    if coupon.maximum_discount:
+        discount = min(discount, coupon.maximum_discount)
+    return min(discount, amount).quantize(Decimal('0.01'))
+
+def validate_coupon(code, amount):
+    """Look up a code through the cache and return (coupon, discount)"""
+    coupon = coupon_cache.get(code)
+    return coupon, coupon_discount(coupon, amount)
+
+def redeem_coupon(coupon):
+    """
+    Count one use of the coupon with a single conditional
+    UPDATE ... SET used_count = used_count + 1 WHERE used_count < usage_limit,
+    raising CouponError when it is used up or no longer valid.
+    """
+    now = timezone.now()
+    updated = (
+        Coupon.objects.filter(pk=coupon.pk, is_active=True, valid_from__lte=now, valid_until__gte=now)
+        .filter(Q(usage_limit__isnull=True) | Q(used_count__lt=F('usage_limit')))
+        .update(used_count=F('used_count') + 1)
+    )
+    if not updated:
+        # The cached coupon may be stale; report why the current row was rejected
+        _check_valid(Coupon.objects.filter(pk=coupon.pk).first(), now)
+        raise CouponError('This coupon has reached its usage limit')
+
+def release_coupon(coupon, uses=1):
+    """Give back uses, e.g. when orders that redeemed the coupon are cancelled"""
+    Coupon.objects.filter(pk=coupon.pk, used_count__gte=uses).update(used_count=F('used_count') - uses)
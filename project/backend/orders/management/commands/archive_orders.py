@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from orders.archive import archivable_orders, archive_cutoff, archive_orders
+
+class Command(BaseCommand):
+    help = 'Move delivered, cancelled and refunded orders older than the cutoff into the archive tables'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Archive orders last changed more than N days ago (default ORDER_ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Orders moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the orders that would be archived')
+    
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['days'])
+        if options['dry_run']:
+            count = archivable_orders(cutoff).count()
+            self.stdout.write(f"{count} orders last changed before {cutoff:%Y-%m-%d %H:%M} would be archived")
+            return
+        started = time.monotonic()
+        count = archive_orders(cutoff, batch_size=options['batch_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Archived {count} orders in {elapsed:.2f}s"))
@@ -0,0 +1,115 @@
+import threading
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from orders.coupons import CouponError, coupon_cache, coupon_discount, redeem_coupon, validate_coupon
+from orders.models import Coupon
+
+class Command(BaseCommand):
+    help = (
+        'Hammer one popular coupon from many threads: validation through the cache vs '
+        'the database, and redemption by conditional UPDATE vs row lock vs unguarded save'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent shoppers (threads)')
+        parser.add_argument('--attempts', type=int, default=50, help='Redemptions attempted per worker')
+        parser.add_argument('--validations', type=int, default=2000, help='Validations per worker')
+        parser.add_argument('--usage-limit', type=int, default=100)
+    
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                'SQLite serializes all writers and ignores SELECT FOR UPDATE; run against Postgres for real numbers'
+            ))
+        failures = []
+        for mode in ('cached', 'database'):
+            self.run(mode, options['validations'], options, self.validate)
+        for mode in ('conditional', 'lock', 'naive'):
+            redeemed, used = self.run(mode, options['attempts'], options, self.redeem)
+            if mode != 'naive' and (used > options['usage_limit'] or used != redeemed):
+                failures.append(f'{mode}: {redeemed} redemptions recorded as {used} uses')
+        if failures:
+            raise CommandError('; '.join(failures))
+    
+    def run(self, mode, attempts, options, attempt):
+        now = timezone.now()
+        coupon = Coupon.objects.create(
+            code=f'BENCH{uuid.uuid4().hex[:8].upper()}', type='percentage', value=10,
+            usage_limit=options['usage_limit'], valid_from=now - timedelta(days=1), valid_until=now + timedelta(days=1),
+        )
+        coupon_cache.clear()
+        results = {'ok': 0, 'rejected': 0, 'errors': 0}
+        results_lock = threading.Lock()
+        barrier = threading.Barrier(options['workers'])
+        
+        def worker():
+            counts = {'ok': 0, 'rejected': 0, 'errors': 0}
+            try:
+                barrier.wait()
+                for _ in range(attempts):
+                    try:
+                        counts['ok' if attempt(mode, coupon) else 'rejected'] += 1
+                    except DatabaseError:
+                        counts['errors'] += 1
+            finally:
+                connection.close()
+                with results_lock:
+                    for key, value in counts.items():
+                        results[key] += value
+        
+        threads = [threading.Thread(target=worker) for _ in range(options['workers'])]
+        try:
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+            used = Coupon.objects.values_list('used_count', flat=True).get(pk=coupon.pk)
+        finally:
+            coupon.delete()
+        
+        total = options['workers'] * attempts
+        self.stdout.write(
+            f"{mode:>11}: {total} attempts in {elapsed:.2f}s ({total / elapsed:.0f}/s): "
+            f"{results['ok']} ok, {results['rejected']} rejected, {results['errors']} errors, used_count {used}"
+        )
+        return results['ok'], used
+    
+    @staticmethod
+    def validate(mode, coupon):
+        amount = Decimal('1000.00')
+        if mode == 'cached':
+            validate_coupon(coupon.code, amount)
+        else:
+            coupon_discount(Coupon.objects.filter(code__iexact=coupon.code).first(), amount)
+        return True
+    
+    @staticmethod
+    def redeem(mode, coupon):
+        if mode == 'conditional':
+            try:
+                redeem_coupon(coupon)
+            except CouponError:
+                return False
+            return True
+        if mode == 'lock':
+            with transaction.atomic():
+                locked = Coupon.objects.select_for_update().get(pk=coupon.pk)
+                if locked.used_count >= locked.usage_limit:
+                    return False
+                locked.used_count += 1
+                locked.save(update_fields=['used_count'])
+            return True
+        # Read-check-write with no guard: the oversell the conditional UPDATE prevents
+        current = Coupon.objects.get(pk=coupon.pk)
+        if current.used_count >= current.usage_limit:
+            return False
+        current.used_count += 1
+        current.save(update_fields=['used_count'])
+        return True
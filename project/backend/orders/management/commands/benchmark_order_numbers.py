@@ -0,0 +1,109 @@
+import multiprocessing
+import time
+import uuid
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.utils.module_loading import import_string
+from orders import order_numbers
+from orders.models import Order
+
+SCHEMES = {
+    'legacy': 'orders.order_numbers.LegacyOrderNumberGenerator',
+    'sequential': 'orders.order_numbers.SequentialOrderNumberGenerator',
+}
+
+def use_scheme(scheme):
+    order_numbers._generator = import_string(SCHEMES[scheme])()
+
+def generate_numbers(args):
+    scheme, count = args
+    use_scheme(scheme)
+    return [order_numbers.generate_order_number() for _ in range(count)]
+
+def insert_orders(args):
+    scheme, count, user_id = args
+    use_scheme(scheme)
+    inserted = errors = 0
+    try:
+        for _ in range(count):
+            try:
+                Order.objects.create(
+                    user_id=user_id, payment_method='mpesa', subtotal=0, total_amount=0,
+                    shipping_name='Benchmark', shipping_address_line1='-', shipping_city='-', shipping_country='-',
+                )
+                inserted += 1
+            except DatabaseError:
+                errors += 1
+    finally:
+        connection.close()
+    return inserted, errors
+
+class Command(BaseCommand):
+    help = (
+        'Generate and insert order numbers from several processes at once, checking '
+        'uniqueness and ordering and measuring throughput per scheme'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--scheme', choices=[*SCHEMES, 'both'], default='both')
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--count', type=int, default=20000, help='Numbers generated per process')
+        parser.add_argument('--inserts', type=int, default=500, help='Orders inserted per process (0 skips)')
+    
+    def handle(self, *args, **options):
+        schemes = list(SCHEMES) if options['scheme'] == 'both' else [options['scheme']]
+        # Children must not share the parent's database connection
+        connection.close()
+        context = multiprocessing.get_context('fork')
+        failures = []
+        with context.Pool(options['processes']) as pool:
+            for scheme in schemes:
+                failures += self.check_generation(pool, scheme, options)
+                if options['inserts']:
+                    self.check_inserts(pool, scheme, options)
+        if failures:
+            raise CommandError('; '.join(failures))
+    
+    def check_generation(self, pool, scheme, options):
+        jobs = [(scheme, options['count'])] * options['processes']
+        started = time.monotonic()
+        batches = pool.map(generate_numbers, jobs)
+        elapsed = time.monotonic() - started
+        
+        numbers = [number for batch in batches for number in batch]
+        duplicates = len(numbers) - len(set(numbers))
+        unordered = sum(batch != sorted(batch) for batch in batches)
+        self.stdout.write(
+            f"{scheme:>10} generate: {len(numbers)} numbers from {options['processes']} processes in "
+            f"{elapsed:.2f}s ({len(numbers) / elapsed:.0f}/s), {duplicates} duplicates, "
+            f"{unordered} processes out of order, e.g. {numbers[-1]}"
+        )
+        failures = []
+        if scheme == 'sequential':
+            if duplicates:
+                failures.append(f'{scheme}: {duplicates} duplicate numbers')
+            if unordered:
+                failures.append(f'{scheme}: numbers not monotonic within a process')
+        return failures
+    
+    def check_inserts(self, pool, scheme, options):
+        user = get_user_model().objects.create_user(
+            email=f'benchmark-{uuid.uuid4().hex[:8]}@example.com',
+            username=f'benchmark-{uuid.uuid4().hex[:8]}',
+            password=uuid.uuid4().hex,
+        )
+        connection.close()
+        try:
+            jobs = [(scheme, options['inserts'], user.pk)] * options['processes']
+            started = time.monotonic()
+            results = pool.map(insert_orders, jobs)
+            elapsed = time.monotonic() - started
+            inserted = sum(count for count, _ in results)
+            errors = sum(count for _, count in results)
+            self.stdout.write(
+                f"{scheme:>10} insert:   {inserted} orders in {elapsed:.2f}s ({inserted / elapsed:.0f}/s), "
+                f"{errors} failed inserts"
+            )
+        finally:
+            user.delete()
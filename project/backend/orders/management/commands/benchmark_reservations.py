@@ -0,0 +1,107 @@
+import threading
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+from orders.cart import CartError
+from orders.models import StockReservation
+from orders.reservations import reserve_stock
+from products.models import Category, Product
+
+class Command(BaseCommand):
+    help = (
+        'Measure checkout throughput against a single hot product, comparing stock '
+        'holds with a row lock held for the whole checkout'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['reserve', 'lock', 'both'], default='both')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent shoppers (threads)')
+        parser.add_argument('--attempts', type=int, default=50, help='Checkouts attempted per worker')
+        parser.add_argument('--stock', type=int, default=200, help='Starting stock of the hot product')
+        parser.add_argument('--work-ms', type=float, default=5.0, help='Simulated checkout work per attempt')
+    
+    def handle(self, *args, **options):
+        modes = ['reserve', 'lock'] if options['mode'] == 'both' else [options['mode']]
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                'SQLite serializes all writers and ignores SELECT FOR UPDATE; run against Postgres for real numbers'
+            ))
+        for mode in modes:
+            self.run(mode, options)
+    
+    def run(self, mode, options):
+        suffix = uuid.uuid4().hex[:8]
+        category = Category.objects.create(name=f'Benchmark {suffix}', slug=f'benchmark-{suffix}', is_active=False)
+        product = Product.objects.create(
+            name=f'Hot product {suffix}', slug=f'hot-product-{suffix}', description='Reservation benchmark',
+            price=100, category=category, stock_quantity=options['stock'], sku=f'BENCH-{suffix}',
+        )
+        attempt = self.reserve if mode == 'reserve' else self.lock
+        work = options['work_ms'] / 1000
+        results = {'sold': 0, 'sold_out': 0, 'errors': 0}
+        results_lock = threading.Lock()
+        barrier = threading.Barrier(options['workers'])
+        
+        def worker():
+            counts = {'sold': 0, 'sold_out': 0, 'errors': 0}
+            try:
+                barrier.wait()
+                for _ in range(options['attempts']):
+                    try:
+                        counts['sold' if attempt(product.pk, work) else 'sold_out'] += 1
+                    except DatabaseError:
+                        counts['errors'] += 1
+            finally:
+                connection.close()
+                with results_lock:
+                    for key, value in counts.items():
+                        results[key] += value
+        
+        threads = [threading.Thread(target=worker) for _ in range(options['workers'])]
+        try:
+            started = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+            
+            remaining = Product.objects.values_list('stock_quantity', flat=True).get(pk=product.pk)
+            held = StockReservation.objects.filter(product=product).count()
+        finally:
+            product.delete()
+            category.delete()
+        
+        total = options['workers'] * options['attempts']
+        self.stdout.write(
+            f"{mode:>8}: {total} attempts by {options['workers']} workers in {elapsed:.2f}s "
+            f"({total / elapsed:.0f}/s): {results['sold']} sold, {results['sold_out']} sold out, "
+            f"{results['errors']} errors, {remaining} left in stock"
+        )
+        if remaining < 0 or results['sold'] + remaining != options['stock']:
+            raise CommandError(f"{mode}: stock accounting is off (oversold or lost updates)")
+        if mode == 'reserve' and held != results['sold']:
+            raise CommandError(f"reserve: {held} reservations for {results['sold']} sales")
+    
+    @staticmethod
+    def reserve(product_id, work):
+        """Hold the stock in a short transaction, then do the checkout work"""
+        try:
+            reserve_stock({product_id: 1}, ttl=60)
+        except CartError:
+            return False
+        time.sleep(work)
+        return True
+    
+    @staticmethod
+    def lock(product_id, work):
+        """Lock the product row and keep it locked for the whole checkout"""
+        with transaction.atomic():
+            product = Product.objects.select_for_update().only('stock_quantity').get(pk=product_id)
+            if product.stock_quantity < 1:
+                return False
+            time.sleep(work)
+            product.stock_quantity -= 1
+            product.save(update_fields=['stock_quantity'])
+        return True
@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from orders.reservations import expire_reservations
+
+class Command(BaseCommand):
+    help = 'Release stock held by reservations that have passed their expiry'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Reservations released per transaction')
+        parser.add_argument('--interval', type=int, default=0, help='Keep sweeping every N seconds instead of running once')
+    
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            count = expire_reservations(batch_size=options['batch_size'])
+            elapsed = time.monotonic() - started
+            if count or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f"Expired {count} reservations in {elapsed:.2f}s"))
+            if not options['interval']:
+                return
+            connection.close()
+            time.sleep(options['interval'])
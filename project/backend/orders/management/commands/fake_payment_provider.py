@@ -0,0 +1,118 @@
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from orders.models import Order
+from orders.payments import stripe_signature
+
+class Command(BaseCommand):
+    help = (
+        'Act as Stripe and M-Pesa for load testing: send signed payment callbacks for '
+        'pending orders to a running server, with provider-style duplicate retries'
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/orders/webhooks/', help='Webhook base URL')
+        parser.add_argument('--provider', choices=['stripe', 'mpesa', 'both'], default='both')
+        parser.add_argument('--events', type=int, default=500, help='Distinct events to send')
+        parser.add_argument('--duplicates', type=int, default=2, help='Times each event is delivered')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--failure-rate', type=float, default=0.1, help='Share of payments that fail')
+    
+    def handle(self, *args, **options):
+        if options['provider'] != 'mpesa' and not settings.STRIPE_WEBHOOK_SECRET:
+            raise CommandError('Set STRIPE_WEBHOOK_SECRET so the callbacks can be signed')
+        providers = ['stripe', 'mpesa'] if options['provider'] == 'both' else [options['provider']]
+        orders = list(
+            Order.objects.filter(payment_status='pending').order_by('created_at')
+            .values_list('pk', 'order_number', 'payment_id', 'total_amount')[:options['events']]
+        )
+        self.stdout.write(f"Paying {len(orders)} pending orders; the rest of the events reference unknown orders")
+        
+        requests = []
+        for n in range(options['events']):
+            provider = providers[n % len(providers)]
+            order = orders[n] if n < len(orders) else (None, f'ORD-FAKE{n}', '', 100)
+            succeeded = random.random() >= options['failure_rate']
+            requests.append(self.build(provider, order, succeeded, options['url']))
+        deliveries = [request for request in requests for _ in range(options['duplicates'])]
+        random.shuffle(deliveries)
+        
+        started = time.monotonic()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            results = list(pool.map(self.send, deliveries))
+        elapsed = time.monotonic() - started
+        
+        latencies = sorted(latency for _, latency in results)
+        codes = {}
+        for code, _ in results:
+            codes[code] = codes.get(code, 0) + 1
+        percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+        self.stdout.write(
+            f"Sent {len(results)} callbacks in {elapsed:.2f}s ({len(results) / elapsed:.0f}/s), "
+            f"statuses {codes}, latency p50 {percentile(0.5):.1f}ms p99 {percentile(0.99):.1f}ms"
+        )
+    
+    def build(self, provider, order, succeeded, base_url):
+        order_id, order_number, payment_id, amount = order
+        if provider == 'stripe':
+            intent_id = payment_id or f'pi_fake_{uuid.uuid4().hex[:24]}'
+            event = {
+                'id': f'evt_fake_{uuid.uuid4().hex[:24]}',
+                'object': 'event',
+                'type': 'payment_intent.succeeded' if succeeded else 'payment_intent.payment_failed',
+                'data': {'object': {
+                    'id': intent_id,
+                    'object': 'payment_intent',
+                    'amount': int(amount * 100),
+                    'metadata': {'order_number': order_number},
+                }},
+            }
+            body = json.dumps(event).encode('utf-8')
+            headers = {'Stripe-Signature': stripe_signature(body, settings.STRIPE_WEBHOOK_SECRET)}
+            url = base_url + 'stripe/'
+        else:
+            checkout_id = payment_id
+            if not checkout_id:
+                checkout_id = f'ws_CO_fake_{uuid.uuid4().hex[:20]}'
+                if order_id:
+                    # Stand in for the STK push that would have recorded this id
+                    Order.objects.filter(pk=order_id).update(payment_id=checkout_id)
+            callback = {
+                'MerchantRequestID': uuid.uuid4().hex[:20],
+                'CheckoutRequestID': checkout_id,
+                'ResultCode': 0 if succeeded else 1032,
+                'ResultDesc': 'The service request is processed successfully.' if succeeded else 'Request cancelled by user',
+            }
+            if succeeded:
+                callback['CallbackMetadata'] = {'Item': [
+                    {'Name': 'Amount', 'Value': float(amount)},
+                    {'Name': 'MpesaReceiptNumber', 'Value': uuid.uuid4().hex[:10].upper()},
+                ]}
+            body = json.dumps({'Body': {'stkCallback': callback}}).encode('utf-8')
+            headers = {}
+            url = base_url + 'mpesa/'
+            token = getattr(settings, 'MPESA_CALLBACK_TOKEN', '')
+            if token:
+                url += f'?token={token}'
+        headers['Content-Type'] = 'application/json'
+        return url, body, headers
+    
+    @staticmethod
+    def send(delivery):
+        url, body, headers = delivery
+        request = urllib.request.Request(url, data=body, headers=headers, method='POST')
+        started = time.monotonic()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                code = response.status
+        except urllib.error.HTTPError as e:
+            code = e.code
+        except urllib.error.URLError:
+            code = 'unreachable'
+        return code, time.monotonic() - started
@@ -0,0 +1,66 @@
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from orders.models import PaymentEvent
+from orders.payments import process_payment_events
+
+MAX_CONSECUTIVE_ERRORS = 5
+
+class Command(BaseCommand):
+    help = 'Apply queued payment provider callbacks to orders with a pool of worker threads'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Worker threads claiming batches concurrently')
+        parser.add_argument('--batch-size', type=int, default=100, help='Events applied per transaction')
+        parser.add_argument('--interval', type=float, default=0, help='Keep polling every N seconds instead of draining once')
+        parser.add_argument('--requeue-failed', action='store_true', help='Retry failed events (e.g. orders not found yet)')
+    
+    def handle(self, *args, **options):
+        if options['requeue_failed']:
+            count = PaymentEvent.objects.filter(status='failed').update(status='pending', error='', processed_at=None)
+            self.stdout.write(f"Requeued {count} failed events")
+        
+        totals = []
+        lock = threading.Lock()
+        
+        def worker():
+            taken = 0
+            errors = 0
+            try:
+                while True:
+                    try:
+                        count = process_payment_events(batch_size=options['batch_size'])
+                    except DatabaseError as e:
+                        # The batch rolled back and stays pending; back off and retry
+                        errors += 1
+                        self.stderr.write(f"{threading.current_thread().name}: {e}")
+                        if errors >= MAX_CONSECUTIVE_ERRORS:
+                            break
+                        connection.close()
+                        time.sleep(errors)
+                        continue
+                    errors = 0
+                    taken += count
+                    if count:
+                        continue
+                    if not options['interval']:
+                        break
+                    time.sleep(options['interval'])
+            finally:
+                connection.close()
+                with lock:
+                    totals.append(taken)
+        
+        started = time.monotonic()
+        threads = [threading.Thread(target=worker, name=f'payment-worker-{n}') for n in range(options['workers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        total = sum(totals)
+        self.stdout.write(self.style.SUCCESS(
+            f"Applied {total} events with {options['workers']} workers in {elapsed:.2f}s "
+            f"({total / elapsed if elapsed else 0:.0f}/s)"
+        ))
@@ -1,11 +1,15 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
+from django.db.models.functions import Coalesce
 from products.models import Product
+from .order_numbers import generate_order_number
 import uuid
 
 User = get_user_model()
 
+ORDER_NUMBER_ATTEMPTS = 3
+
 class Cart(models.Model):
     """Shopping Cart Model"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -29,6 +33,23 @@ class Cart(models.Model):
     def total_price(self):
         return self.product.price * self.quantity
 
+class OrderQuerySet(models.QuerySet):
+    def with_details(self):
+        """Items (with their products) and status history in a fixed number of queries"""
+        return self.select_related('coupon').prefetch_related(
+            'items',
+            models.Prefetch('items__product', queryset=Product.objects.for_listing()),
+            'status_history',
+        )
+    
+    def with_summary(self):
+        """Item counts without loading the items"""
+        item_model = self.model.items.rel.related_model
+        item_count = item_model.objects.filter(order=models.OuterRef('pk')).values('order').annotate(
+            total=models.Sum('quantity')
+        ).values('total')
+        return self.annotate(item_count=Coalesce(models.Subquery(item_count), 0))
+
 class Order(models.Model):
     """Order Model"""
     
@@ -69,6 +90,7 @@ class Order(models.Model):
     tax_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, validators=[MinValueValidator(0)])
     shipping_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, validators=[MinValueValidator(0)])
     discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, validators=[MinValueValidator(0)])
+    coupon = models.ForeignKey('Coupon', on_delete=models.SET_NULL, null=True, blank=True, related_name='orders')
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
     
     # Shipping Address
@@ -96,6 +118,8 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = OrderQuerySet.as_manager()
+    
     class Meta:
         db_table = 'orders'
         verbose_name = 'Order'
@@ -111,11 +135,18 @@ class Order(models.Model):
         return f"Order {self.order_number} - {self.user.full_name}"
     
     def save(self, *args, **kwargs):
-        if not self.order_number:
-            # Generate unique order number
-            import time
-            self.order_number = f"ORD-{int(time.time())}-{uuid.uuid4().hex[:6].upper()}"
-        super().save(*args, **kwargs)
+        if self.order_number:
+            return super().save(*args, **kwargs)
+        
+        # Generate unique order number, retrying if it is somehow taken
+        for attempt in range(ORDER_NUMBER_ATTEMPTS):
+            self.order_number = generate_order_number()
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == ORDER_NUMBER_ATTEMPTS - 1 or not Order.objects.filter(order_number=self.order_number).exists():
+                    raise
     
     @property
     def can_be_cancelled(self):
@@ -225,4 +256,166 @@ class OrderStatusHistory(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.order.order_number} - {self.get_status_display()}"
\ No newline at end of file
+        return f"{self.order.order_number} - {self.get_status_display()}"
+
+class StockReservation(models.Model):
+    """Short-lived hold on product stock, converted to a sale on payment"""
+    
+    STATUS_CHOICES = [
+        ('held', 'Held'),
+        ('converted', 'Converted'),
+        ('released', 'Released'),
+        ('expired', 'Expired'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_reservations')
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, null=True, blank=True, related_name='reservations')
+    quantity = models.IntegerField(validators=[MinValueValidator(1)])
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='held')
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'stock_reservations'
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} x{self.quantity} ({self.get_status_display()})"
+
+class PaymentEvent(models.Model):
+    """Payment provider callback, stored as received and applied by the payment worker"""
+    
+    PROVIDER_CHOICES = [
+        ('stripe', 'Stripe'),
+        ('mpesa', 'M-Pesa'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    provider = models.CharField(max_length=20, choices=PROVIDER_CHOICES)
+    event_id = models.CharField(max_length=255)  # Provider's id, the idempotency key
+    event_type = models.CharField(max_length=100, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'payment_events'
+        verbose_name = 'Payment Event'
+        verbose_name_plural = 'Payment Events'
+        ordering = ['-received_at']
+        unique_together = ['provider', 'event_id']
+        indexes = [
+            models.Index(fields=['status', 'received_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_provider_display()} {self.event_type} {self.event_id}"
+
+class ArchivedOrder(models.Model):
+    """
+    Completed order moved out of the hot orders table by archive_orders.
+    Same columns as Order, so rows are copied with INSERT ... SELECT.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    order_number = models.CharField(max_length=50, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_orders')
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    payment_status = models.CharField(max_length=20, choices=Order.PAYMENT_STATUS_CHOICES)
+    payment_method = models.CharField(max_length=20, choices=Order.PAYMENT_METHOD_CHOICES)
+    payment_id = models.CharField(max_length=255, blank=True)
+    
+    # Pricing
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2)
+    tax_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    shipping_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    coupon = models.ForeignKey(Coupon, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    
+    # Shipping Address
+    shipping_name = models.CharField(max_length=255)
+    shipping_email = models.EmailField(blank=True)
+    shipping_phone = models.CharField(max_length=20, blank=True)
+    shipping_address_line1 = models.CharField(max_length=255)
+    shipping_address_line2 = models.CharField(max_length=255, blank=True)
+    shipping_city = models.CharField(max_length=100)
+    shipping_state = models.CharField(max_length=100, blank=True)
+    shipping_postal_code = models.CharField(max_length=20, blank=True)
+    shipping_country = models.CharField(max_length=100)
+    
+    # Billing Address
+    billing_name = models.CharField(max_length=255, blank=True)
+    billing_address_line1 = models.CharField(max_length=255, blank=True)
+    billing_city = models.CharField(max_length=100, blank=True)
+    billing_postal_code = models.CharField(max_length=20, blank=True)
+    billing_country = models.CharField(max_length=100, blank=True)
+    
+    notes = models.TextField(blank=True)
+    tracking_number = models.CharField(max_length=100, blank=True)
+    shipped_at = models.DateTimeField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    
+    objects = OrderQuerySet.as_manager()
+    
+    class Meta:
+        db_table = 'orders_archive'
+        verbose_name = 'Archived Order'
+        verbose_name_plural = 'Archived Orders'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Order {self.order_number} (archived)"
+
+class ArchivedOrderItem(models.Model):
+    """Order Item of an archived order"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    product_name = models.CharField(max_length=255)
+    product_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.IntegerField()
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'order_items_archive'
+        verbose_name = 'Archived Order Item'
+        verbose_name_plural = 'Archived Order Items'
+        ordering = ['created_at']
+
+class ArchivedOrderStatusHistory(models.Model):
+    """Status History of an archived order"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='status_history')
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    notes = models.TextField(blank=True)
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'order_status_history_archive'
+        verbose_name = 'Archived Order Status History'
+        verbose_name_plural = 'Archived Order Status Histories'
+        ordering = ['-created_at']
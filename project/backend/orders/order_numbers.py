@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from products.response_cache import is_process_local
+
+DEFAULT_GENERATOR = 'orders.order_numbers.SequentialOrderNumberGenerator'
+NODE_COUNTER_KEY = 'orders:number:node:next'
+NODE_LEASE_KEY = 'orders:number:node:{}'
+
+def get_node_cache():
+    return caches[getattr(settings, 'ORDER_NUMBER_NODE_CACHE_ALIAS', 'default')]
+
+def node_lease_timeout():
+    return getattr(settings, 'ORDER_NUMBER_NODE_LEASE', 300)
+
+class OrderNumberGenerator:
+    """Base class for order number schemes"""
+    prefix = 'ORD-'
+
+    def generate(self):
+        raise NotImplementedError
+
+class LegacyOrderNumberGenerator(OrderNumberGenerator):
+    """
+    The original scheme: epoch seconds plus six random hex digits. Numbers
+    land at random points in the unique index and can collide under bursts.
+    """
+
+    def generate(self):
+        return f"{self.prefix}{int(time.time())}-{uuid.uuid4().hex[:6].upper()}"
+
+# Crockford base32: no I, L, O or U, so numbers are easy to read out and type
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+class SequentialOrderNumberGenerator(OrderNumberGenerator):
+    """
+    Time + node + sequence numbers, e.g. ORD-0Q8Z4M1K20C1Y.
+
+    A 64-bit value of milliseconds since 2024-01-01 (42 bits), the node id
+    (10 bits) and a per-millisecond sequence (12 bits), written as 13
+    fixed-width base32 characters. Numbers from one node sort in creation
+    order and never repeat, and all nodes append near the end of the index.
+
+    Uniqueness across processes relies on every live process having its own
+    node id. ORDER_NUMBER_NODE_ID fixes it, which only suits deployments that
+    run one process per configured value. Otherwise each process leases a
+    free id from the ORDER_NUMBER_NODE_CACHE_ALIAS cache (which must be
+    shared, e.g. Redis): the lease is renewed while the process generates
+    numbers and re-taken if it ever lapsed. With a process-local cache the id
+    falls back to the process id modulo 1024, which can repeat between
+    workers; the orders.W001 system check warns about that outside DEBUG.
+    """
+    epoch_ms = 1704067200000
+    node_bits = 10
+    sequence_bits = 12
+    width = 13
+
+    def __init__(self, node_id=None):
+        self.configured_node_id = node_id
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.lease = None
+        node_id = self.configured_node_id
+        if node_id is None:
+            node_id = getattr(settings, 'ORDER_NUMBER_NODE_ID', None)
+        if node_id is None:
+            if is_process_local(get_node_cache()):
+                node_id = self.pid
+            else:
+                node_id = self.lease_node_id()
+        self.node_id = node_id % (1 << self.node_bits)
+        self.last_ms = 0
+        self.sequence = 0
+
+    def lease_node_id(self):
+        """Claim a node id no other live process holds"""
+        cache = get_node_cache()
+        token = uuid.uuid4().hex
+        nodes = 1 << self.node_bits
+        try:
+            start = cache.incr(NODE_COUNTER_KEY)
+        except ValueError:
+            cache.add(NODE_COUNTER_KEY, 0, timeout=None)
+            start = cache.incr(NODE_COUNTER_KEY)
+        for offset in range(nodes):
+            node_id = (start + offset) % nodes
+            if cache.add(NODE_LEASE_KEY.format(node_id), token, node_lease_timeout()):
+                self.lease = (node_id, token, time.monotonic())
+                return node_id
+        raise ImproperlyConfigured(f'All {nodes} order number node ids are leased')
+
+    def renew_lease(self):
+        node_id, token, renewed = self.lease
+        now = time.monotonic()
+        if now - renewed < node_lease_timeout() / 3:
+            return
+        cache = get_node_cache()
+        key = NODE_LEASE_KEY.format(node_id)
+        if cache.get(key) == token:
+            cache.touch(key, node_lease_timeout())
+            self.lease = (node_id, token, now)
+        else:
+            # Idle long enough for the lease to lapse; another process may own it now
+            self.reset()
+
+    def next_value(self):
+        with self.lock:
+            if os.getpid() != self.pid:
+                # Forked worker: take a fresh node id and sequence
+                self.reset()
+            elif self.lease is not None:
+                self.renew_lease()
+            now_ms = int(time.time() * 1000) - self.epoch_ms
+            if now_ms > self.last_ms:
+                self.last_ms = now_ms
+                self.sequence = 0
+            else:
+                # Same millisecond, or the clock stepped back: keep counting
+                # from the last timestamp so values never go backwards
+                self.sequence += 1
+                if self.sequence >> self.sequence_bits:
+                    self.last_ms += 1
+                    self.sequence = 0
+            return (
+                (self.last_ms << (self.node_bits + self.sequence_bits))
+                | (self.node_id << self.sequence_bits)
+                | self.sequence
+            )
+
+    def generate(self):
+        value = self.next_value()
+        chars = []
+        for _ in range(self.width):
+            value, digit = divmod(value, 32)
+            chars.append(ALPHABET[digit])
+        return self.prefix + ''.join(reversed(chars))
+
+_generator = None
+
+def get_order_number_generator():
+    global _generator
+    if _generator is None:
+        _generator = import_string(getattr(settings, 'ORDER_NUMBER_GENERATOR', DEFAULT_GENERATOR))()
+    return _generator
+
+def generate_order_number():
+    return get_order_number_generator().generate()
@@ -0,0 +1,34 @@
+from django.core.exceptions import ImproperlyConfigured
+from products.pagination import KeysetPagination
+
+class OrderHistoryPagination(KeysetPagination):
+    """
+    Keyset pagination over the hot orders table and the archive together.
+
+    Each page seeks the same position in both tables, then merges the two
+    short result lists, so archived orders show up in history as if they
+    had never moved. Rows are compared on their sort keys in Python, so the
+    ordering is always the view's own and may only use non-null columns;
+    client ?ordering= is never applied.
+    """
+    default_ordering = ['-created_at']
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(getattr(view, 'ordering', None) or self.default_ordering)
+        for field in ordering:
+            name = field.lstrip('-')
+            if name not in (self.tiebreak_field, 'id') and queryset.model._meta.get_field(name).null:
+                raise ImproperlyConfigured(f'Order history can\'t be ordered by nullable field {name!r}')
+        return self.with_tiebreak(ordering)
+
+    def fetch(self, queryset, ordering, cursor, limit, view=None):
+        results = super().fetch(queryset, ordering, cursor, limit, view)
+        get_archive_queryset = getattr(view, 'get_archive_queryset', None)
+        if get_archive_queryset is None:
+            return results
+        results += super().fetch(get_archive_queryset(), ordering, cursor, limit, view)
+        # Stable sorts from the last key to the first give the combined order
+        for field in reversed(ordering):
+            name = field.lstrip('-')
+            results.sort(key=lambda row: getattr(row, name), reverse=field.startswith('-'))
+        return results[:limit]
@@ -0,0 +1,203 @@
+import hashlib
+import hmac
+import json
+import logging
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .cart import CartError
+from .models import Order, PaymentEvent
+from .reservations import confirm_reservations
+from .transitions import bulk_transition
+
+logger = logging.getLogger(__name__)
+
+# Payment status an event moves an order to, and the statuses it may move it from
+PAYMENT_TRANSITIONS = {
+    'paid': {'pending', 'failed'},
+    'failed': {'pending'},
+    'refunded': {'paid'},
+}
+
+STRIPE_EVENT_STATUS = {
+    'payment_intent.succeeded': 'paid',
+    'payment_intent.payment_failed': 'failed',
+    'charge.refunded': 'refunded',
+}
+
+class WebhookError(Exception):
+    """Raised when a callback fails verification or can't be parsed"""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+def stripe_signature(body, secret, timestamp=None):
+    """Stripe-Signature header value for body (used by the fake provider)"""
+    timestamp = int(timestamp or time.time())
+    signed = f'{timestamp}.'.encode('utf-8') + body
+    digest = hmac.new(secret.encode('utf-8'), signed, hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+def verify_stripe_signature(body, header, secret=None, tolerance=None):
+    """Check a Stripe-Signature header (v1 HMAC-SHA256 scheme) against the raw body"""
+    secret = secret if secret is not None else settings.STRIPE_WEBHOOK_SECRET
+    tolerance = tolerance if tolerance is not None else getattr(settings, 'STRIPE_WEBHOOK_TOLERANCE', 300)
+    if not secret:
+        raise WebhookError('Stripe webhooks are not configured')
+    try:
+        pairs = [item.split('=', 1) for item in (header or '').split(',')]
+        timestamp = int(next(value for key, value in pairs if key == 't'))
+        signatures = [value for key, value in pairs if key == 'v1']
+    except (ValueError, StopIteration):
+        raise WebhookError('Malformed signature header')
+    if tolerance and abs(time.time() - timestamp) > tolerance:
+        raise WebhookError('Signature timestamp outside the tolerance window')
+    expected = stripe_signature(body, secret, timestamp).split('v1=', 1)[1]
+    if not any(hmac.compare_digest(expected, signature) for signature in signatures):
+        raise WebhookError('Invalid signature')
+
+def verify_mpesa_token(token):
+    """
+    M-Pesa callbacks aren't signed, so MPESA_CALLBACK_URL should carry a
+    ?token= matching MPESA_CALLBACK_TOKEN. Without a token configured every
+    callback is rejected, except with DEBUG on.
+    """
+    expected = getattr(settings, 'MPESA_CALLBACK_TOKEN', '')
+    if not expected:
+        if settings.DEBUG:
+            return
+        raise WebhookError('MPESA_CALLBACK_TOKEN is not configured')
+    if not hmac.compare_digest(expected, token or ''):
+        raise WebhookError('Invalid callback token')
+
+def parse_stripe(body):
+    try:
+        event = json.loads(body)
+        return event['id'], event['type'], event
+    except (ValueError, KeyError, TypeError):
+        raise WebhookError('Malformed event')
+
+def parse_mpesa(payload):
+    try:
+        callback = payload['Body']['stkCallback']
+        return callback['CheckoutRequestID'], 'stk_callback', payload
+    except (KeyError, TypeError):
+        raise WebhookError('Malformed callback')
+
+def store_event(provider, event_id, event_type, payload):
+    """
+    Put a callback in the inbox with a single INSERT ... ON CONFLICT DO NOTHING;
+    provider retries of the same event are dropped.
+    """
+    PaymentEvent.objects.bulk_create(
+        [PaymentEvent(provider=provider, event_id=event_id, event_type=event_type, payload=payload)],
+        ignore_conflicts=True,
+    )
+
+# What a well-signed but oddly shaped payload can raise while being read
+PAYLOAD_ERRORS = (AttributeError, KeyError, TypeError, ValueError)
+
+def event_outcome(event):
+    """
+    (order reference, payment status, payment id) for an event, or None when
+    the event doesn't change a payment. The reference is ('order_number', x)
+    or ('payment_id', x). Payloads of an unexpected shape raise one of
+    PAYLOAD_ERRORS.
+    """
+    if event.provider == 'stripe':
+        payment_status = STRIPE_EVENT_STATUS.get(event.event_type)
+        if payment_status is None:
+            return None
+        obj = event.payload['data']['object']
+        payment_id = obj.get('payment_intent') if obj.get('object') == 'charge' else obj.get('id')
+        order_number = (obj.get('metadata') or {}).get('order_number')
+        if not isinstance(payment_id or '', str) or not isinstance(order_number or '', str):
+            raise ValueError('Unexpected payment reference')
+        reference = ('order_number', order_number) if order_number else ('payment_id', payment_id)
+        return reference, payment_status, payment_id or ''
+    callback = event.payload['Body']['stkCallback']
+    payment_status = 'paid' if str(callback.get('ResultCode')) == '0' else 'failed'
+    return ('payment_id', event.event_id), payment_status, event.event_id
+
+def process_payment_events(batch_size=100):
+    """
+    Apply one batch of pending inbox events, returning how many were taken.
+
+    Events are claimed with SKIP LOCKED so several workers can drain the
+    inbox together. Orders are loaded with one query, payment changes are
+    written with one bulk_update, and newly paid orders are confirmed (their
+    stock holds made permanent) through the bulk status transition.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        events = list(
+            PaymentEvent.objects.filter(status='pending')
+            .order_by('received_at')
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        if not events:
+            return 0
+        outcomes = {}
+        results = defaultdict(list)
+        for event in events:
+            try:
+                outcomes[event.pk] = event_outcome(event)
+            except PAYLOAD_ERRORS as e:
+                # Fail just this event so it can't hold up the rest of the inbox
+                results[('failed', f'Unreadable payload: {e!r}'[:500])].append(event.pk)
+        references = defaultdict(set)
+        for outcome in outcomes.values():
+            if outcome is not None:
+                references[outcome[0][0]].add(outcome[0][1])
+        orders = {}
+        if references:
+            lookup = Q(order_number__in=references['order_number']) | Q(payment_id__in=references['payment_id'])
+            for order in (
+                Order.objects.filter(lookup).select_for_update()
+                .only('id', 'order_number', 'payment_id', 'payment_status', 'status')
+            ):
+                orders[('order_number', order.order_number)] = order
+                if order.payment_id:
+                    orders[('payment_id', order.payment_id)] = order
+
+        changed = {}
+        for event in events:
+            if event.pk not in outcomes:
+                continue
+            outcome = outcomes[event.pk]
+            if outcome is None:
+                results[('ignored', '')].append(event.pk)
+                continue
+            reference, payment_status, payment_id = outcome
+            order = orders.get(reference)
+            if order is None:
+                results[('failed', 'Order not found')].append(event.pk)
+                continue
+            if order.payment_status in PAYMENT_TRANSITIONS[payment_status]:
+                order.payment_status = payment_status
+                order.payment_id = order.payment_id or payment_id
+                order.updated_at = now
+                changed[order.pk] = order
+            results[('processed', '')].append(event.pk)
+
+        if changed:
+            Order.objects.bulk_update(list(changed.values()), ['payment_status', 'payment_id', 'updated_at'])
+            paid = [order for order in changed.values() if order.payment_status == 'paid']
+            for order in paid:
+                try:
+                    with transaction.atomic():
+                        confirm_reservations(order)
+                except CartError as e:
+                    logger.warning('Order %s paid but its stock is gone: %s', order.order_number, e.errors)
+            if paid:
+                bulk_transition(
+                    Order.objects.filter(pk__in=[order.pk for order in paid], status='pending'),
+                    'confirmed', notes='Payment received',
+                )
+        for (status, error), pks in results.items():
+            PaymentEvent.objects.filter(pk__in=pks).update(status=status, error=error, processed_at=now)
+    return len(events)
@@ -0,0 +1,81 @@
+import hashlib
+from decimal import Decimal, ROUND_HALF_UP
+from django.conf import settings
+from django.core.cache import cache
+from products.response_cache import get_versions
+from .coupons import CouponError, normalize_code, validate_coupon
+from .models import Coupon
+
+CENT = Decimal('0.01')
+
+def money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+def pricing_rules():
+    return {
+        'tax_rate': Decimal(str(getattr(settings, 'ORDER_TAX_RATE', 0))),
+        'shipping_fee': money(getattr(settings, 'ORDER_SHIPPING_FEE', 0)),
+        'free_shipping_minimum': money(getattr(settings, 'ORDER_FREE_SHIPPING_MINIMUM', 0)),
+    }
+
+def quote_key(lines, coupon_code, rules):
+    """
+    Key on the cart contents with their current unit prices, the coupon and
+    its version, and the pricing rules. Prices are part of the key (they come
+    from the same query as the lines) rather than the Product cache version,
+    which moves on every stock change and would throw quotes away on each sale.
+    """
+    parts = [f'{product_id}:{quantity}:{unit_price}' for product_id, quantity, unit_price in sorted(lines)]
+    if coupon_code:
+        parts.append(f'coupon:{normalize_code(coupon_code)}:{get_versions([Coupon])[0]}')
+    parts.append(':'.join(str(value) for value in rules.values()))
+    digest = hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+    return f'pricing:quote:{digest}'
+
+def compute_quote(lines, coupon_code, rules):
+    """Totals for (product_id, quantity, unit_price) lines in one pass"""
+    subtotal = Decimal('0.00')
+    item_count = 0
+    for _, quantity, unit_price in lines:
+        subtotal += unit_price * quantity
+        item_count += quantity
+
+    discount = Decimal('0.00')
+    coupon_id = coupon_error = None
+    if coupon_code:
+        try:
+            coupon, discount = validate_coupon(coupon_code, subtotal)
+            coupon_id = coupon.pk
+        except CouponError as e:
+            coupon_error = e.message
+
+    taxable = subtotal - discount
+    tax = money(taxable * rules['tax_rate'])
+    minimum = rules['free_shipping_minimum']
+    shipping = Decimal('0.00') if not lines or (minimum and subtotal >= minimum) else rules['shipping_fee']
+    return {
+        'line_count': len(lines),
+        'item_count': item_count,
+        'subtotal': money(subtotal),
+        'discount_amount': money(discount),
+        'tax_amount': tax,
+        'shipping_amount': shipping,
+        'total_amount': money(taxable + tax + shipping),
+        'coupon_code': normalize_code(coupon_code) if coupon_id else None,
+        'coupon_id': coupon_id,
+        'coupon_error': coupon_error,
+    }
+
+def quote_lines(lines, coupon_code=None):
+    """
+    Cached quote for (product_id, quantity, unit_price) lines; the cart page
+    and checkout price the same cart once between them.
+    """
+    lines = list(lines)
+    rules = pricing_rules()
+    key = quote_key(lines, coupon_code, rules)
+    quote = cache.get(key)
+    if quote is None:
+        quote = compute_quote(lines, coupon_code, rules)
+        cache.set(key, quote, getattr(settings, 'PRICING_QUOTE_TIMEOUT', 300))
+    return quote
@@ -0,0 +1,88 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import StockReservation
+from .stock import decrement_stock, restore_stock
+
+def reservation_ttl():
+    return getattr(settings, 'STOCK_RESERVATION_TTL', 0)
+
+def reserve_stock(quantities, user=None, ttl=None):
+    """
+    Hold quantities ({product_id: qty}) of stock for ttl seconds.
+
+    The stock is taken with conditional UPDATEs in a transaction of its own,
+    so a hot product's row is only locked for the length of that statement
+    rather than for the whole checkout. Returns the new reservations.
+    """
+    expires_at = timezone.now() + timedelta(seconds=ttl or reservation_ttl())
+    with transaction.atomic():
+        decrement_stock(quantities)
+        return StockReservation.objects.bulk_create([
+            StockReservation(product_id=product_id, user=user, quantity=quantity, expires_at=expires_at)
+            for product_id, quantity in quantities.items()
+        ])
+
+def _release(reservations, status, skip_locked=False, limit=None):
+    with transaction.atomic():
+        held = reservations.filter(status='held').select_for_update(skip_locked=skip_locked)
+        if limit:
+            held = held.order_by('expires_at')[:limit]
+        rows = list(held.values_list('pk', 'product_id', 'quantity'))
+        if not rows:
+            return 0
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in rows]).update(
+            status=status, updated_at=timezone.now()
+        )
+        quantities = Counter()
+        for _, product_id, quantity in rows:
+            quantities[product_id] += quantity
+        restore_stock(quantities)
+    return len(rows)
+
+def release_reservations(reservations):
+    """Give the stock of held reservations (a queryset) back, e.g. when an order is cancelled"""
+    return _release(reservations, 'released')
+
+def expire_reservations(now=None, batch_size=500):
+    """
+    Release holds past their expiry in batches, returning how many expired.
+
+    Rows another transaction is converting or releasing are skipped rather
+    than waited on; they are picked up by the next sweep if still held.
+    """
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        count = _release(
+            StockReservation.objects.filter(expires_at__lte=now),
+            'expired', skip_locked=True, limit=batch_size
+        )
+        expired += count
+        if count < batch_size:
+            return expired
+
+def confirm_reservations(order):
+    """
+    Turn an order's holds into permanent sales once it is paid.
+
+    Holds that expired before payment arrived take their stock again;
+    CartError is raised if it has been sold in the meantime.
+    """
+    with transaction.atomic():
+        reservations = StockReservation.objects.filter(order=order)
+        converted = reservations.filter(status='held').update(status='converted', updated_at=timezone.now())
+        lapsed = list(
+            reservations.filter(status='expired').select_for_update().values_list('pk', 'product_id', 'quantity')
+        )
+        if lapsed:
+            quantities = Counter()
+            for _, product_id, quantity in lapsed:
+                quantities[product_id] += quantity
+            decrement_stock(quantities)
+            StockReservation.objects.filter(pk__in=[pk for pk, _, _ in lapsed]).update(
+                status='converted', updated_at=timezone.now()
+            )
+    return converted + len(lapsed)
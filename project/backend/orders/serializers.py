@@ -0,0 +1,144 @@
+from rest_framework import serializers
+from .cart import MAX_CART_LINES
+from .models import Order, OrderItem, OrderStatusHistory
+
+class CartLineSerializer(serializers.Serializer):
+    """Cart line input"""
+    product = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=0)
+
+class CartAddSerializer(serializers.Serializer):
+    """Bulk add to cart"""
+    items = CartLineSerializer(many=True, allow_empty=False, max_length=MAX_CART_LINES)
+    
+    def validate_items(self, value):
+        if any(line['quantity'] < 1 for line in value):
+            raise serializers.ValidationError("Quantity must be at least 1")
+        return value
+
+class CartUpdateSerializer(serializers.Serializer):
+    """Bulk set cart quantities (0 removes the line)"""
+    items = CartLineSerializer(many=True, allow_empty=False, max_length=MAX_CART_LINES)
+
+class CartRemoveSerializer(serializers.Serializer):
+    """Bulk remove from cart (empty list clears the cart)"""
+    products = serializers.ListField(child=serializers.UUIDField(), required=False, max_length=MAX_CART_LINES)
+
+class CartItemSerializer(serializers.Serializer):
+    """Priced cart line, as returned by cart_lines()"""
+    id = serializers.UUIDField()
+    product_id = serializers.UUIDField()
+    product_name = serializers.CharField()
+    product_slug = serializers.CharField()
+    primary_image = serializers.CharField(allow_null=True)
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    quantity = serializers.IntegerField()
+    line_total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    stock_quantity = serializers.IntegerField()
+    is_available = serializers.BooleanField()
+    updated_at = serializers.DateTimeField()
+
+class CartTotalsSerializer(serializers.Serializer):
+    """Pricing quote for a cart, as returned by quote_lines()"""
+    line_count = serializers.IntegerField()
+    item_count = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+    discount_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    tax_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    shipping_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    coupon_code = serializers.CharField(allow_null=True)
+    coupon_error = serializers.CharField(allow_null=True)
+
+class CartSerializer(serializers.Serializer):
+    """Cart contents and subtotal"""
+    items = CartItemSerializer(many=True)
+    line_count = serializers.IntegerField()
+    item_count = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+class CheckoutSerializer(serializers.ModelSerializer):
+    """Checkout input: payment method, addresses and an optional coupon"""
+    coupon_code = serializers.CharField(max_length=50, required=False, allow_blank=True)
+    
+    class Meta:
+        model = Order
+        fields = [
+            'payment_method',
+            'shipping_name', 'shipping_email', 'shipping_phone', 'shipping_address_line1',
+            'shipping_address_line2', 'shipping_city', 'shipping_state', 'shipping_postal_code',
+            'shipping_country',
+            'billing_name', 'billing_address_line1', 'billing_city', 'billing_postal_code',
+            'billing_country',
+            'notes', 'coupon_code',
+        ]
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    """Order Item Serializer"""
+    product_slug = serializers.CharField(source='product.slug', read_only=True)
+    product_image = serializers.CharField(source='product.primary_image', read_only=True)
+    
+    class Meta:
+        model = OrderItem
+        fields = [
+            'id', 'product', 'product_slug', 'product_image', 'product_name', 'product_price',
+            'quantity', 'total_price',
+        ]
+
+class OrderStatusHistorySerializer(serializers.ModelSerializer):
+    """Order Status History Serializer"""
+    
+    class Meta:
+        model = OrderStatusHistory
+        fields = ['status', 'notes', 'created_at']
+
+class OrderSummarySerializer(serializers.ModelSerializer):
+    """Order list entry without line items"""
+    item_count = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'order_number', 'status', 'payment_status', 'payment_method',
+            'total_amount', 'item_count', 'created_at',
+        ]
+        read_only_fields = fields
+
+class OrderSerializer(serializers.ModelSerializer):
+    """Order Serializer"""
+    items = OrderItemSerializer(many=True, read_only=True)
+    status_history = OrderStatusHistorySerializer(many=True, read_only=True)
+    coupon_code = serializers.CharField(source='coupon.code', default=None, read_only=True)
+    
+    class Meta:
+        model = Order
+        fields = [
+            'id', 'order_number', 'status', 'payment_status', 'payment_method',
+            'subtotal', 'tax_amount', 'shipping_amount', 'discount_amount', 'coupon_code', 'total_amount',
+            'shipping_name', 'shipping_email', 'shipping_phone', 'shipping_address_line1',
+            'shipping_address_line2', 'shipping_city', 'shipping_state', 'shipping_postal_code',
+            'shipping_country', 'notes', 'tracking_number', 'shipped_at', 'delivered_at',
+            'items', 'status_history', 'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
+
+class CouponValidateSerializer(serializers.Serializer):
+    """Coupon check input; amount defaults to the cart subtotal"""
+    code = serializers.CharField(max_length=50)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+
+class CouponPreviewSerializer(serializers.Serializer):
+    """Discount a valid coupon gives on an amount"""
+    code = serializers.CharField()
+    type = serializers.CharField()
+    value = serializers.DecimalField(max_digits=10, decimal_places=2)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    discount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+class BulkStatusSerializer(serializers.Serializer):
+    """Bulk order status change input"""
+    orders = serializers.ListField(child=serializers.CharField(max_length=50), allow_empty=False, max_length=1000)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+    tracking_numbers = serializers.DictField(child=serializers.CharField(max_length=100), required=False)
@@ -0,0 +1,60 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from products.cards import refresh_product_cards
+from products.models import Product
+from products.response_cache import bump_version_on_commit
+from .cart import CartError
+
+def _by_quantity(quantities):
+    groups = defaultdict(list)
+    for product_id, quantity in quantities.items():
+        groups[quantity].append(product_id)
+    return [(quantity, sorted(groups[quantity])) for quantity in sorted(groups)]
+
+def _stock_changed(product_ids, crossed):
+    # queryset.update() doesn't send signals
+    refresh_product_cards(product_ids)
+    if crossed:
+        # Cached listings only show is_in_stock; the detail view patches in live counts
+        bump_version_on_commit(Product)
+
+def decrement_stock(quantities):
+    """
+    Take quantities ({product_id: qty}) out of stock with conditional UPDATEs.
+
+    Products sharing a quantity share one
+    UPDATE ... SET stock_quantity = stock_quantity - qty WHERE id IN (...) AND stock_quantity >= qty,
+    so a cart costs one statement per distinct quantity rather than a read, a
+    lock and a write per line. Raises CartError, rolling back the caller's
+    transaction, when any product doesn't have enough stock.
+    """
+    with transaction.atomic():
+        for quantity, product_ids in _by_quantity(quantities):
+            savepoint = transaction.savepoint()
+            updated = Product.objects.filter(
+                pk__in=product_ids, is_active=True, stock_quantity__gte=quantity
+            ).update(stock_quantity=F('stock_quantity') - quantity)
+            if updated != len(product_ids):
+                # Undo this group's partial UPDATE so the re-read shows the stock it was checked against
+                transaction.savepoint_rollback(savepoint)
+                available = dict(
+                    Product.objects.filter(pk__in=product_ids, is_active=True).values_list('pk', 'stock_quantity')
+                )
+                short = {
+                    str(pk): available.get(pk, 0)
+                    for pk in product_ids
+                    if available.get(pk, 0) < quantity
+                }
+                raise CartError('Not enough stock for some products', {'available': short})
+            transaction.savepoint_commit(savepoint)
+    # Products already at zero fail the UPDATE, so any zero now was crossed here
+    crossed = Product.objects.filter(pk__in=list(quantities), stock_quantity=0).exists()
+    _stock_changed(list(quantities), crossed)
+
+def restore_stock(quantities):
+    """Put quantities ({product_id: qty}) back into stock"""
+    crossed = Product.objects.filter(pk__in=list(quantities), stock_quantity=0).exists()
+    for quantity, product_ids in _by_quantity(quantities):
+        Product.objects.filter(pk__in=product_ids).update(stock_quantity=F('stock_quantity') + quantity)
+    _stock_changed(list(quantities), crossed)
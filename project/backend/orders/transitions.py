@@ -0,0 +1,96 @@
+from collections import Counter
+from django.db import transaction
+from django.utils import timezone
+from .coupons import release_coupon
+from .models import Coupon, Order, OrderItem, OrderStatusHistory, StockReservation
+from .reservations import release_reservations
+from .stock import restore_stock
+
+ALLOWED_TRANSITIONS = {
+    'pending': {'confirmed', 'cancelled'},
+    'confirmed': {'processing', 'cancelled'},
+    'processing': {'shipped', 'cancelled'},
+    'shipped': {'delivered'},
+    'delivered': {'refunded'},
+    'cancelled': set(),
+    'refunded': set(),
+}
+
+TRANSITION_FIELDS = ['status', 'tracking_number', 'shipped_at', 'delivered_at', 'updated_at']
+
+def can_transition(current, new_status):
+    return new_status in ALLOWED_TRANSITIONS.get(current, set())
+
+def bulk_transition(orders, new_status, changed_by=None, notes='', tracking_numbers=None, batch_size=500):
+    """
+    Move many orders to new_status in one transaction.
+
+    orders is an Order queryset. Orders that can't make the transition are
+    left alone and reported. The rest are written with bulk_update, and
+    their history rows with one bulk_create. tracking_numbers optionally maps
+    order numbers to tracking numbers. Returns (updated, rejected), where
+    rejected maps order numbers to a reason.
+    """
+    if new_status not in ALLOWED_TRANSITIONS:
+        raise ValueError(f'Unknown order status: {new_status}')
+    tracking_numbers = tracking_numbers or {}
+    now = timezone.now()
+    updated = []
+    rejected = {}
+    with transaction.atomic():
+        locked = (
+            orders.select_for_update()
+            .only('id', 'order_number', 'status', 'coupon_id', *TRANSITION_FIELDS)
+            .order_by('pk')
+        )
+        for order in locked:
+            if not can_transition(order.status, new_status):
+                rejected[order.order_number] = f'Cannot change a {order.status} order to {new_status}'
+                continue
+            order.status = new_status
+            order.updated_at = now
+            if order.order_number in tracking_numbers:
+                order.tracking_number = tracking_numbers[order.order_number]
+            if new_status == 'shipped' and not order.shipped_at:
+                order.shipped_at = now
+            if new_status == 'delivered' and not order.delivered_at:
+                order.delivered_at = now
+            updated.append(order)
+        if not updated:
+            return updated, rejected
+
+        Order.objects.bulk_update(updated, TRANSITION_FIELDS, batch_size=batch_size)
+        OrderStatusHistory.objects.bulk_create(
+            [
+                OrderStatusHistory(order=order, status=new_status, notes=notes, changed_by=changed_by)
+                for order in updated
+            ],
+            batch_size=batch_size,
+        )
+        if new_status == 'cancelled':
+            _release_cancelled(updated)
+    return updated, rejected
+
+def _release_cancelled(orders):
+    """Give back the stock and coupon uses of cancelled orders"""
+    order_ids = [order.pk for order in orders]
+    # Orders with live or lapsed holds get their stock back through the
+    # reservations; stock sold at checkout or on payment goes back directly
+    handled = set(
+        StockReservation.objects.filter(order_id__in=order_ids)
+        .exclude(status='converted')
+        .values_list('order_id', flat=True)
+    )
+    release_reservations(StockReservation.objects.filter(order_id__in=handled))
+    quantities = Counter()
+    for product_id, quantity in (
+        OrderItem.objects.filter(order_id__in=[pk for pk in order_ids if pk not in handled])
+        .values_list('product_id', 'quantity')
+    ):
+        quantities[product_id] += quantity
+    if quantities:
+        restore_stock(quantities)
+
+    coupon_uses = Counter(order.coupon_id for order in orders if order.coupon_id)
+    for coupon_id, uses in coupon_uses.items():
+        release_coupon(Coupon(pk=coupon_id), uses)
@@ -0,0 +1,27 @@
+from django.urls import path
+from . import views
+
+app_name = 'orders'
+
+urlpatterns = [
+    # Order history
+    path('', views.OrderListView.as_view(), name='order-list'),
+    
+    # Fulfilment
+    path('bulk-status/', views.BulkOrderStatusView.as_view(), name='bulk-status'),
+    
+    # Cart
+    path('cart/', views.CartView.as_view(), name='cart'),
+    
+    # Checkout
+    path('checkout/', views.CheckoutView.as_view(), name='checkout'),
+    
+    # Payment provider callbacks
+    path('webhooks/stripe/', views.StripeWebhookView.as_view(), name='stripe-webhook'),
+    path('webhooks/mpesa/', views.MpesaWebhookView.as_view(), name='mpesa-webhook'),
+    
+    # Coupons
+    path('coupons/validate/', views.CouponValidateView.as_view(), name='coupon-validate'),
+    
+    path('<str:order_number>/', views.OrderDetailView.as_view(), name='order-detail'),
+]
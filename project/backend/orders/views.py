@@ -0,0 +1,270 @@
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .cart import CartError, add_items, cart_lines, remove_items, set_items
+from .checkout import checkout
+from .coupons import CouponError, validate_coupon
+from .models import ArchivedOrder, Order
+from .pagination import OrderHistoryPagination
+from .payments import WebhookError, parse_mpesa, parse_stripe, store_event, verify_mpesa_token, verify_stripe_signature
+from .pricing import quote_lines
+from .transitions import bulk_transition
+from .serializers import (
+    CartAddSerializer, CartUpdateSerializer, CartRemoveSerializer, CartSerializer, CartTotalsSerializer,
+    CheckoutSerializer, OrderSerializer, OrderSummarySerializer, CouponValidateSerializer, CouponPreviewSerializer,
+    BulkStatusSerializer
+)
+
+def cart_data(user, coupon_code=None):
+    """Cart lines plus the (cached) pricing quote for them"""
+    lines = cart_lines(user)
+    quote = quote_lines(
+        ((item['product_id'], item['quantity'], item['unit_price']) for item in lines['items']), coupon_code
+    )
+    data = CartSerializer(lines).data
+    data['totals'] = CartTotalsSerializer(quote).data
+    return data
+
+class CartView(APIView):
+    """View the cart or add, update and remove many lines in one request"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        """The cart; ?coupon= prices it with a coupon applied"""
+        return Response({
+            'success': True,
+            'data': cart_data(request.user, request.query_params.get('coupon'))
+        }, status=status.HTTP_200_OK)
+    
+    def post(self, request):
+        """Add quantities to the cart"""
+        return self.apply(request, CartAddSerializer, lambda data: add_items(request.user, data['items']))
+    
+    def patch(self, request):
+        """Set line quantities; 0 removes a line"""
+        return self.apply(request, CartUpdateSerializer, lambda data: set_items(request.user, data['items']))
+    
+    def delete(self, request):
+        """Remove lines, or clear the cart when no products are given"""
+        return self.apply(request, CartRemoveSerializer, lambda data: remove_items(request.user, data.get('products')))
+    
+    def apply(self, request, serializer_class, change):
+        serializer = serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Cart update failed',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            change(serializer.validated_data)
+        except CartError as e:
+            return Response({
+                'success': False,
+                'message': e.message,
+                'errors': e.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'success': True,
+            'message': 'Cart updated',
+            'data': cart_data(request.user)
+        }, status=status.HTTP_200_OK)
+
+class CheckoutView(APIView):
+    """Place an order for everything in the cart"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        serializer = CheckoutSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Checkout failed',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            order = checkout(request.user, **serializer.validated_data)
+        except CartError as e:
+            return Response({
+                'success': False,
+                'message': e.message,
+                'errors': e.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'success': True,
+            'message': 'Order placed successfully',
+            'data': OrderSerializer(Order.objects.with_details().get(pk=order.pk)).data
+        }, status=status.HTTP_201_CREATED)
+
+class CouponValidateView(APIView):
+    """Check a coupon code and preview its discount"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        serializer = CouponValidateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Invalid coupon request',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        amount = serializer.validated_data.get('amount')
+        if amount is None:
+            amount = cart_lines(request.user)['subtotal']
+        try:
+            coupon, discount = validate_coupon(serializer.validated_data['code'], amount)
+        except CouponError as e:
+            return Response({
+                'success': False,
+                'message': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'success': True,
+            'data': CouponPreviewSerializer({
+                'code': coupon.code,
+                'type': coupon.type,
+                'value': coupon.value,
+                'amount': amount,
+                'discount': discount,
+                'total': amount - discount,
+            }).data
+        }, status=status.HTTP_200_OK)
+
+class OrderListView(generics.ListAPIView):
+    """
+    The user's order history, newest first, with keyset paging across the
+    hot and archived orders. ?view=summary drops the line items; ?status=
+    filters by status.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OrderHistoryPagination
+    # Status is filtered by hand; client ordering would break the keyset cursor
+    filter_backends = []
+    ordering = ['-created_at']
+    
+    def is_summary(self):
+        return self.request.query_params.get('view') == 'summary'
+    
+    def history_queryset(self, model):
+        queryset = model.objects.filter(user=self.request.user)
+        order_status = self.request.query_params.get('status')
+        if order_status:
+            queryset = queryset.filter(status=order_status)
+        if self.is_summary():
+            return queryset.with_summary()
+        return queryset.with_details()
+    
+    def get_queryset(self):
+        return self.history_queryset(Order)
+    
+    def get_archive_queryset(self):
+        return self.history_queryset(ArchivedOrder)
+    
+    def get_serializer_class(self):
+        return OrderSummarySerializer if self.is_summary() else OrderSerializer
+
+class OrderDetailView(generics.RetrieveAPIView):
+    """A single order of the user's, by order number"""
+    serializer_class = OrderSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = 'order_number'
+    
+    def get_queryset(self):
+        return Order.objects.filter(user=self.request.user).with_details()
+    
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            # Completed orders move to the archive after a while
+            return get_object_or_404(
+                ArchivedOrder.objects.filter(user=self.request.user).with_details(),
+                order_number=self.kwargs['order_number']
+            )
+
+class BulkOrderStatusView(APIView):
+    """Move many orders to a new status at once (admin only)"""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        if not request.user.is_admin:
+            return Response({
+                'success': False,
+                'message': 'Only admins can change order status'
+            }, status=status.HTTP_403_FORBIDDEN)
+        
+        serializer = BulkStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Invalid status change',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = serializer.validated_data
+        order_numbers = set(data['orders'])
+        updated, rejected = bulk_transition(
+            Order.objects.filter(order_number__in=order_numbers),
+            data['status'],
+            changed_by=request.user,
+            notes=data['notes'],
+            tracking_numbers=data.get('tracking_numbers'),
+        )
+        found = {order.order_number for order in updated} | set(rejected)
+        for order_number in order_numbers - found:
+            rejected[order_number] = 'Order not found'
+        
+        return Response({
+            'success': True,
+            'message': f'{len(updated)} orders updated',
+            'data': {
+                'updated': [order.order_number for order in updated],
+                'rejected': rejected,
+            }
+        }, status=status.HTTP_200_OK)
+
+class StripeWebhookView(APIView):
+    """Verify a Stripe event and queue it for the payment worker"""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    
+    def post(self, request):
+        # The signature covers the raw body, so read it before any parsing
+        body = request.body
+        try:
+            verify_stripe_signature(body, request.META.get('HTTP_STRIPE_SIGNATURE'))
+            event_id, event_type, payload = parse_stripe(body)
+        except WebhookError as e:
+            return Response({
+                'success': False,
+                'message': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        store_event('stripe', event_id, event_type, payload)
+        return Response({'success': True}, status=status.HTTP_200_OK)
+
+class MpesaWebhookView(APIView):
+    """Verify an M-Pesa STK callback and queue it for the payment worker"""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    
+    def post(self, request):
+        try:
+            verify_mpesa_token(request.query_params.get('token'))
+            event_id, event_type, payload = parse_mpesa(request.data)
+        except WebhookError as e:
+            return Response({
+                'ResultCode': 1,
+                'ResultDesc': e.message
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        store_event('mpesa', event_id, event_type, payload)
+        return Response({'ResultCode': 0, 'ResultDesc': 'Accepted'}, status=status.HTTP_200_OK)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import Category, Product, ProductImage, Review, Wishlist
+from .ratings import set_reviews_approved
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -28,7 +29,7 @@ class ProductAdmin(admin.ModelAdmin):
     list_filter = ('category', 'is_active', 'is_featured', 'brand', 'created_at')
     search_fields = ('name', 'description', 'sku', 'brand')
     prepopulated_fields = {'slug': ('name',)}
-    readonly_fields = ('rating_average', 'rating_count', 'view_count', 'created_at', 'updated_at')
+    readonly_fields = ('rating_average', 'rating_count', 'rating_distribution', 'view_count', 'created_at', 'updated_at')
     inlines = [ProductImageInline]
     
     fieldsets = (
@@ -51,7 +52,7 @@ class ProductAdmin(admin.ModelAdmin):
             'fields': ('is_active', 'is_featured')
         }),
         ('Statistics', {
-            'fields': ('rating_average', 'rating_count', 'view_count', 'created_at', 'updated_at'),
+            'fields': ('rating_average', 'rating_count', 'rating_distribution', 'view_count', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
@@ -84,11 +85,11 @@ class ReviewAdmin(admin.ModelAdmin):
     actions = ['approve_reviews', 'disapprove_reviews']
     
     def approve_reviews(self, request, queryset):
-        queryset.update(is_approved=True)
+        set_reviews_approved(queryset, True)
     approve_reviews.short_description = "Approve selected reviews"
     
     def disapprove_reviews(self, request, queryset):
-        queryset.update(is_approved=False)
+        set_reviews_approved(queryset, False)
     disapprove_reviews.short_description = "Disapprove selected reviews"
 
 @admin.register(Wishlist)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class ProductsConfig(AppConfig):
+    """Products app configuration"""
+    name = 'products'
+    
+    def ready(self):
+        # Register cache invalidation signal handlers
+        from . import signals  # noqa: F401
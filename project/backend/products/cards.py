@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.fields import DateTimeField
+from .models import Product, ProductCard
+
+# Product fields copied onto the card
+CARD_SOURCE_FIELDS = {
+    'name', 'slug', 'short_description', 'price', 'original_price', 'category', 'category_id',
+    'brand', 'images', 'stock_quantity', 'rating_average', 'rating_count', 'is_featured', 'is_active',
+}
+
+CARD_UPDATE_FIELDS = [
+    'name', 'slug', 'short_description', 'price', 'original_price', 'category', 'category_name',
+    'brand', 'primary_image', 'stock_quantity', 'is_in_stock', 'discount_percentage',
+    'rating_average', 'rating_count', 'is_featured', 'is_active', 'created_at', 'refreshed_at',
+]
+
+def use_product_cards():
+    return getattr(settings, 'PRODUCT_CARD_READ_MODEL', False)
+
+def build_card(product):
+    """Card row for a product loaded through Product.objects.for_listing()"""
+    return ProductCard(
+        product_id=product.pk,
+        name=product.name,
+        slug=product.slug,
+        short_description=product.short_description,
+        price=product.price,
+        original_price=product.original_price,
+        category_id=product.category_id,
+        category_name=product.category.name,
+        brand=product.brand,
+        primary_image=product.primary_image,
+        stock_quantity=product.stock_quantity,
+        is_in_stock=product.is_in_stock,
+        discount_percentage=product.discount_percentage,
+        rating_average=product.rating_average,
+        rating_count=product.rating_count,
+        is_featured=product.is_featured,
+        is_active=product.is_active,
+        created_at=product.created_at,
+        refreshed_at=timezone.now(),
+    )
+
+def refresh_product_cards(products=None, batch_size=500):
+    """Upsert card rows for the given products (a queryset or ids), all products by default"""
+    queryset = Product.objects.for_listing().order_by()
+    if products is not None:
+        if not hasattr(products, 'values'):
+            products = list(products)
+            if not products:
+                return 0
+        queryset = queryset.filter(pk__in=products)
+    count = 0
+    batch = []
+    for product in queryset.iterator(chunk_size=batch_size):
+        batch.append(build_card(product))
+        if len(batch) >= batch_size:
+            count += _upsert(batch)
+            batch = []
+    if batch:
+        count += _upsert(batch)
+    return count
+
+def _upsert(cards):
+    ProductCard.objects.bulk_create(
+        cards,
+        update_conflicts=True,
+        unique_fields=['product'],
+        update_fields=CARD_UPDATE_FIELDS,
+    )
+    return len(cards)
+
+def rename_category_cards(category):
+    ProductCard.objects.filter(category=category).update(category_name=category.name)
+
+_datetime_field = DateTimeField()
+
+def card_to_dict(card, wishlist_ids=None):
+    """
+    Render a card like ProductListSerializer without going through DRF
+    field machinery; used when PRODUCT_CARD_SERIALIZER_BYPASS is on.
+    """
+    data = {
+        'id': str(card.product_id),
+        'name': card.name,
+        'slug': card.slug,
+        'short_description': card.short_description,
+        'price': card.price,
+        'original_price': card.original_price,
+        'category': str(card.category_id),
+        'category_name': card.category_name,
+        'brand': card.brand,
+        'primary_image': card.primary_image,
+        'is_in_stock': card.is_in_stock,
+        'rating_average': card.rating_average,
+        'rating_count': card.rating_count,
+        'discount_percentage': card.discount_percentage,
+        'is_featured': card.is_featured,
+        'is_wishlisted': wishlist_ids is not None and card.product_id in wishlist_ids,
+        'created_at': _datetime_field.to_representation(card.created_at),
+    }
+    # DRF renders model decimals as strings
+    for field in ('price', 'original_price', 'rating_average'):
+        if data[field] is not None:
+            data[field] = str(data[field])
+    return data
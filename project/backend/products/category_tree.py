@@ -0,0 +1,60 @@
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from .models import Category, Product
+from .response_cache import is_process_local
+
+CATEGORY_TREE_CACHE_KEY = 'products:category_tree'
+
+class CategoryTree:
+    """Active category tree loaded with one query for categories and one for product counts"""
+    
+    def __init__(self, categories, product_counts):
+        self.categories = {category.id: category for category in categories}
+        self.product_counts = product_counts
+        self.children = defaultdict(list)
+        self.roots = []
+        for category in categories:
+            if category.parent_id is None:
+                self.roots.append(category)
+            else:
+                self.children[category.parent_id].append(category)
+    
+    @classmethod
+    def load(cls):
+        categories = list(Category.objects.filter(is_active=True))
+        product_counts = dict(
+            Product.objects.filter(is_active=True)
+            .order_by()
+            .values_list('category_id')
+            .annotate(count=Count('id'))
+        )
+        return cls(categories, product_counts)
+    
+    def serialize(self):
+        """Render the tree with CategorySerializer and index every node by slug"""
+        from .serializers import CategorySerializer
+        roots = CategorySerializer(self.roots, many=True, context={'category_tree': self}).data
+        by_slug = {}
+        pending = list(roots)
+        while pending:
+            node = pending.pop()
+            by_slug[node['slug']] = node
+            pending.extend(node['children'])
+        # Only categories reachable from an active root are listed
+        return {'roots': list(roots), 'by_slug': by_slug}
+
+def get_category_tree():
+    """Return the serialized category tree, building and caching it on a miss"""
+    if is_process_local(cache):
+        # Another worker's category save can't delete this process's copy
+        return CategoryTree.load().serialize()
+    tree = cache.get(CATEGORY_TREE_CACHE_KEY)
+    if tree is None:
+        tree = CategoryTree.load().serialize()
+        cache.set(CATEGORY_TREE_CACHE_KEY, tree, getattr(settings, 'CATEGORY_TREE_CACHE_TIMEOUT', 3600))
+    return tree
+
+def invalidate_category_tree():
+    cache.delete(CATEGORY_TREE_CACHE_KEY)
@@ -0,0 +1,95 @@
+from collections import Counter, defaultdict
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import Case, When, Value, Count, IntegerField, BooleanField
+from django.db.models.functions import Cast, Floor
+
+DEFAULT_PRICE_BUCKETS = [500, 1000, 2500, 5000, 10000]
+
+def price_buckets():
+    """Upper bounds of the price ranges; the last range is open-ended"""
+    return [Decimal(str(bound)) for bound in getattr(settings, 'PRODUCT_FACET_PRICE_BUCKETS', DEFAULT_PRICE_BUCKETS)]
+
+def compute_facets(queryset):
+    """
+    Facet counts for a filtered product queryset.
+
+    All facets come from one GROUP BY over (brand, category, price bucket,
+    star floor, in stock) which is then rolled up per facet in Python.
+    """
+    bounds = price_buckets()
+    price_bucket = Case(
+        *[When(price__lt=bound, then=Value(index)) for index, bound in enumerate(bounds)],
+        default=Value(len(bounds)),
+        output_field=IntegerField(),
+    )
+    in_stock = Case(
+        When(stock_quantity__gt=0, then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField(),
+    )
+    rows = (
+        queryset.order_by()
+        .annotate(
+            facet_price=price_bucket,
+            facet_stars=Cast(Floor('rating_average'), IntegerField()),
+            facet_in_stock=in_stock,
+        )
+        .values(
+            'brand', 'category_id', 'category__name', 'category__slug',
+            'facet_price', 'facet_stars', 'facet_in_stock',
+        )
+        .annotate(count=Count('id'))
+    )
+
+    total = 0
+    brands = Counter()
+    categories = {}
+    category_counts = Counter()
+    prices = Counter()
+    stars = Counter()
+    availability = defaultdict(int)
+    for row in rows:
+        count = row['count']
+        total += count
+        if row['brand']:
+            brands[row['brand']] += count
+        categories[row['category_id']] = (row['category__name'], row['category__slug'])
+        category_counts[row['category_id']] += count
+        prices[row['facet_price']] += count
+        stars[row['facet_stars'] or 0] += count
+        availability['in_stock' if row['facet_in_stock'] else 'out_of_stock'] += count
+
+    price_ranges = []
+    lower = Decimal('0')
+    for index in range(len(bounds) + 1):
+        upper = bounds[index] if index < len(bounds) else None
+        price_ranges.append({
+            # Strings like DRF renders decimals, not JSON floats
+            'min_price': str(lower),
+            'max_price': str(upper) if upper is not None else None,
+            'count': prices.get(index, 0),
+        })
+        lower = upper
+
+    # "N stars & up" counts, matching the min_rating filter
+    ratings = []
+    running = 0
+    for star in range(5, 0, -1):
+        running += stars.get(star, 0)
+        ratings.append({'min_rating': star, 'count': running})
+
+    return {
+        'total': total,
+        'brands': [{'value': brand, 'count': count} for brand, count in brands.most_common()],
+        'categories': [
+            {'id': category_id, 'name': categories[category_id][0], 'slug': categories[category_id][1], 'count': count}
+            for category_id, count in category_counts.most_common()
+        ],
+        'price_ranges': price_ranges,
+        'ratings': ratings,
+        'availability': {
+            'in_stock': availability['in_stock'],
+            'out_of_stock': availability['out_of_stock'],
+        },
+    }
@@ -1,7 +1,7 @@
 # filters.py
 import django_filters
-from django.db.models import Q
-from .models import Product
+from .models import Product, ProductCard
+from .search import search_products
 
 class ProductFilter(django_filters.FilterSet):
     """Product filtering with slug"""
@@ -28,10 +28,12 @@ class ProductFilter(django_filters.FilterSet):
         return queryset.filter(stock_quantity__gt=0 if value else 0)
 
     def filter_search(self, queryset, name, value):
-        return queryset.filter(
-            Q(name__icontains=value)
-            | Q(description__icontains=value)
-            | Q(brand__icontains=value)
-            | Q(tags__icontains=value)
-        )
+        return search_products(queryset, value)
 
+
+class ProductCardFilter(ProductFilter):
+    """ProductFilter applied to the product card read model"""
+
+    class Meta:
+        model = ProductCard
+        fields = ["category_slug", "brand", "is_featured"]
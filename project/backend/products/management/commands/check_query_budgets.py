@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from products.models import Category, Product, ProductImage
+from products import views
+from products.response_cache import get_cache
+
+# Maximum queries per request for each listing endpoint
+QUERY_BUDGETS = {
+    # Keyset pages fetch a single page query
+    'product_list': (views.ProductListView, '/api/products/', {}, 1),
+    'product_list_filtered': (views.ProductListView, '/api/products/', {'ordering': 'price', 'in_stock': 'true'}, 1),
+    # Page-number mode adds the COUNT
+    'product_list_paged': (views.ProductListView, '/api/products/', {'page': 2}, 2),
+    'featured_products': (views.FeaturedProductsView, '/api/products/featured/', {}, 1),
+    # Search adds one full-text index lookup
+    'product_search': (views.ProductSearchView, '/api/products/search/', {'q': 'budget'}, 3),
+}
+
+class Command(BaseCommand):
+    help = 'Fail if any product listing endpoint exceeds its query budget'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=40, help='Number of fixture products to create')
+    
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        failures = []
+        # Measure the uncached path
+        get_cache().clear()
+        
+        # Fixtures are rolled back once the budgets have been measured
+        with transaction.atomic():
+            self.create_fixtures(options['products'])
+            for name, (view_class, path, params, budget) in QUERY_BUDGETS.items():
+                view = view_class.as_view()
+                request = factory.get(path, params)
+                with CaptureQueriesContext(connection) as ctx:
+                    response = view(request)
+                    response.render()
+                
+                used = len(ctx.captured_queries)
+                if response.status_code != 200:
+                    failures.append(f"{name}: HTTP {response.status_code}")
+                elif used > budget:
+                    failures.append(f"{name}: {used} queries (budget {budget})")
+                self.stdout.write(f"{name}: {used}/{budget} queries")
+            transaction.set_rollback(True)
+        
+        if failures:
+            raise CommandError('Query budget exceeded:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('All listing endpoints are within budget'))
+    
+    def create_fixtures(self, count):
+        category = Category.objects.create(name='Query Budget Category', slug='query-budget-category')
+        for i in range(count):
+            product = Product.objects.create(
+                name=f'Budget Product {i}',
+                slug=f'budget-product-{i}',
+                description='Query budget fixture',
+                price=10 + i,
+                stock_quantity=i % 3,
+                category=category,
+                is_featured=i % 2 == 0,
+                # Half the products fall back to ProductImage for their primary image
+                images=[f'https://example.com/{i}.jpg'] if i % 2 else [],
+            )
+            if not product.images:
+                ProductImage.objects.create(
+                    product=product,
+                    image_url=f'https://example.com/primary-{i}.jpg',
+                    is_primary=True,
+                )
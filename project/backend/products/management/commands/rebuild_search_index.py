@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from products.search import get_search_backend
+
+class Command(BaseCommand):
+    help = 'Rebuild the product full-text search index from the products table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Products indexed per batch')
+    
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        started = time.monotonic()
+        with transaction.atomic():
+            count = backend.rebuild(batch_size=options['batch_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} products with {type(backend).__name__} in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from products.models import Product
+from products.ratings import recompute_ratings
+
+class Command(BaseCommand):
+    help = 'Recompute product rating aggregates and star histograms from approved reviews'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Products written per bulk update')
+        parser.add_argument('--product', action='append', dest='products', help='Only repair this product id (repeatable)')
+    
+    def handle(self, *args, **options):
+        products = Product.objects.all()
+        if options['products']:
+            products = products.filter(pk__in=options['products'])
+        started = time.monotonic()
+        count = recompute_ratings(products, batch_size=options['batch_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Recomputed ratings for {count} products in {elapsed:.2f}s"))
@@ -0,0 +1,17 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from products.cards import refresh_product_cards
+
+class Command(BaseCommand):
+    help = 'Rebuild the product card read model from the products table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Cards upserted per statement')
+    
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        with transaction.atomic():
+            count = refresh_product_cards(batch_size=options['batch_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {count} product cards in {elapsed:.2f}s"))
@@ -0,0 +1,56 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5('
+            'product_id UNINDEXED, name, brand, tags, description, '
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            'INSERT INTO products_fts (product_id, name, brand, tags, description) '
+            "SELECT id, name, brand, (SELECT group_concat(value, ' ') FROM json_each(tags)), description "
+            'FROM products'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE IF NOT EXISTS products_search ('
+            'product_id uuid PRIMARY KEY REFERENCES products (id) ON DELETE CASCADE, '
+            'document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS products_search_document_idx '
+            'ON products_search USING GIN (document)'
+        )
+        schema_editor.execute(
+            "INSERT INTO products_search (product_id, document) "
+            "SELECT id, "
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(brand, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce("
+            "(SELECT string_agg(value, ' ') FROM jsonb_array_elements_text("
+            "CASE WHEN jsonb_typeof(tags::jsonb) = 'array' THEN tags::jsonb ELSE '[]'::jsonb END)), '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C') "
+            "FROM products"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS products_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS products_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:40
+
+from decimal import Decimal
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    Review = apps.get_model('products', 'Review')
+    histograms = {}
+    rows = (
+        Review.objects.filter(is_approved=True)
+        .order_by()
+        .values_list('product_id', 'rating')
+        .annotate(n=models.Count('id'))
+    )
+    for product_id, rating, n in rows:
+        histograms.setdefault(product_id, {})[rating] = n
+    products = []
+    for product in Product.objects.filter(pk__in=histograms):
+        histogram = histograms[product.pk]
+        product.rating_count = sum(histogram.values())
+        product.rating_sum = sum(star * n for star, n in histogram.items())
+        product.rating_average = round(Decimal(product.rating_sum) / product.rating_count, 2)
+        for star in range(1, 6):
+            setattr(product, f'rating_{star}_count', histogram.get(star, 0))
+        products.append(product)
+    Product.objects.bulk_update(
+        products,
+        ['rating_count', 'rating_sum', 'rating_average'] + [f'rating_{star}_count' for star in range(1, 6)],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1_count',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2_count',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3_count',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4_count',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5_count',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
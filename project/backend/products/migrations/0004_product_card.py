@@ -0,0 +1,89 @@
+# Generated by Django 4.2.7 on 2026-10-17 22:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_product_cards(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+    ProductCard = apps.get_model('products', 'ProductCard')
+    primary_images = {}
+    for product_id, image_url in (
+        ProductImage.objects.filter(is_primary=True)
+        .order_by('-sort_order', '-created_at')
+        .values_list('product_id', 'image_url')
+    ):
+        # Ordered so the first image by (sort_order, created_at) wins
+        primary_images[product_id] = image_url
+    cards = []
+    now = django.utils.timezone.now()
+    for product in Product.objects.select_related('category'):
+        discount = 0
+        if product.original_price and product.original_price > product.price:
+            discount = round(((product.original_price - product.price) / product.original_price) * 100, 2)
+        cards.append(ProductCard(
+            product_id=product.pk,
+            name=product.name,
+            slug=product.slug,
+            short_description=product.short_description,
+            price=product.price,
+            original_price=product.original_price,
+            category_id=product.category_id,
+            category_name=product.category.name,
+            brand=product.brand,
+            primary_image=product.images[0] if product.images else primary_images.get(product.pk),
+            stock_quantity=product.stock_quantity,
+            is_in_stock=product.stock_quantity > 0,
+            discount_percentage=discount,
+            rating_average=product.rating_average,
+            rating_count=product.rating_count,
+            is_featured=product.is_featured,
+            is_active=product.is_active,
+            created_at=product.created_at,
+            refreshed_at=now,
+        ))
+    ProductCard.objects.bulk_create(cards, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductCard',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='products.product')),
+                ('name', models.CharField(max_length=255)),
+                ('slug', models.SlugField(max_length=255)),
+                ('short_description', models.TextField(blank=True, max_length=500)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('original_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('category_name', models.CharField(max_length=100)),
+                ('brand', models.CharField(blank=True, max_length=100)),
+                ('primary_image', models.TextField(blank=True, null=True)),
+                ('stock_quantity', models.IntegerField(default=0)),
+                ('is_in_stock', models.BooleanField(default=False)),
+                ('discount_percentage', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('rating_average', models.DecimalField(decimal_places=2, default=0, max_digits=3)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('is_featured', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_cards', to='products.category')),
+            ],
+            options={
+                'verbose_name': 'Product Card',
+                'verbose_name_plural': 'Product Cards',
+                'db_table': 'product_cards',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['category', 'is_active'], name='product_car_categor_610521_idx'), models.Index(fields=['is_active', 'is_featured'], name='product_car_is_acti_349dba_idx'), models.Index(fields=['price'], name='product_car_price_a0ead5_idx'), models.Index(fields=['rating_average'], name='product_car_rating__cec313_idx'), models.Index(fields=['created_at'], name='product_car_created_1eeb40_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_product_cards, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.text import slugify
@@ -33,6 +33,23 @@ class Category(models.Model):
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
 
+RATING_FIELDS = [
+    'rating_average', 'rating_count', 'rating_sum',
+    'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+]
+
+class ProductQuerySet(models.QuerySet):
+    """Product QuerySet"""
+    
+    def for_listing(self):
+        """Join the category and annotate the primary image so list pages run in constant queries"""
+        primary_image = ProductImage.objects.filter(
+            product=models.OuterRef('pk'), is_primary=True
+        ).order_by('sort_order', 'created_at').values('image_url')[:1]
+        return self.select_related('category').annotate(
+            primary_image_url=models.Subquery(primary_image)
+        )
+
 class Product(models.Model):
     """Product Model"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -58,10 +75,19 @@ class Product(models.Model):
     is_featured = models.BooleanField(default=False)
     rating_average = models.DecimalField(max_digits=3, decimal_places=2, default=0, validators=[MinValueValidator(0), MaxValueValidator(5)])
     rating_count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    # Running aggregates over approved reviews, maintained by products.ratings
+    rating_sum = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    rating_1_count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    rating_2_count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    rating_3_count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    rating_4_count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
+    rating_5_count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     view_count = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ProductQuerySet.as_manager()
+    
     class Meta:
         db_table = 'products'
         verbose_name = 'Product'
@@ -98,17 +124,25 @@ class Product(models.Model):
             return round(((self.original_price - self.price) / self.original_price) * 100, 2)
         return 0
     
+    @property
+    def primary_image(self):
+        if self.images:
+            return self.images[0]
+        if hasattr(self, 'primary_image_url'):
+            # Annotated by Product.objects.for_listing()
+            return self.primary_image_url
+        primary_image = self.product_images.filter(is_primary=True).first()
+        return primary_image.image_url if primary_image else None
+    
+    @property
+    def rating_distribution(self):
+        return {str(star): getattr(self, f'rating_{star}_count') for star in range(5, 0, -1)}
+    
     def update_rating(self):
-        """Update product rating based on reviews"""
-        from .models import Review
-        reviews = Review.objects.filter(product=self, is_approved=True)
-        if reviews.exists():
-            self.rating_average = reviews.aggregate(avg_rating=models.Avg('rating'))['avg_rating'] or 0
-            self.rating_count = reviews.count()
-        else:
-            self.rating_average = 0
-            self.rating_count = 0
-        self.save(update_fields=['rating_average', 'rating_count'])
+        """Recompute product rating aggregates from approved reviews"""
+        from .ratings import recompute_ratings
+        recompute_ratings(Product.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=RATING_FIELDS)
 
 class ProductImage(models.Model):
     """Product Image Model"""
@@ -153,10 +187,32 @@ class Review(models.Model):
     def __str__(self):
         return f"{self.user.full_name} - {self.product.name} ({self.rating}★)"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._rating_state = instance.rating_state() if instance._rating_fields_loaded() else None
+        return instance
+    
+    def _rating_fields_loaded(self):
+        deferred = self.get_deferred_fields()
+        return not deferred & {'product', 'product_id', 'rating', 'is_approved'}
+    
+    def rating_state(self):
+        """What this review contributes to its product's rating aggregates"""
+        return (self.product_id, self.rating, self.is_approved)
+    
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update product rating
-        self.product.update_rating()
+        from .ratings import apply_rating_deltas, rating_deltas
+        previous = None
+        if not self._state.adding:
+            previous = getattr(self, '_rating_state', None)
+            if previous is None:
+                previous = Review.objects.filter(pk=self.pk).values_list('product_id', 'rating', 'is_approved').first()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Update product rating aggregates by delta
+            apply_rating_deltas(rating_deltas(previous, self.rating_state()))
+        self._rating_state = self.rating_state()
 
 class Wishlist(models.Model):
     """User Wishlist Model"""
@@ -173,4 +229,42 @@ class Wishlist(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.user.full_name} - {self.product.name}"
\ No newline at end of file
+        return f"{self.user.full_name} - {self.product.name}"
+
+class ProductCard(models.Model):
+    """Denormalized product listing row, refreshed from Product by products.cards"""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='card')
+    name = models.CharField(max_length=255)
+    slug = models.SlugField(max_length=255)
+    short_description = models.TextField(max_length=500, blank=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    original_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='product_cards')
+    category_name = models.CharField(max_length=100)
+    brand = models.CharField(max_length=100, blank=True)
+    primary_image = models.TextField(blank=True, null=True)
+    stock_quantity = models.IntegerField(default=0)
+    is_in_stock = models.BooleanField(default=False)
+    discount_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    rating_average = models.DecimalField(max_digits=3, decimal_places=2, default=0)
+    rating_count = models.IntegerField(default=0)
+    is_featured = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    refreshed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'product_cards'
+        verbose_name = 'Product Card'
+        verbose_name_plural = 'Product Cards'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['category', 'is_active']),
+            models.Index(fields=['is_active', 'is_featured']),
+            models.Index(fields=['price']),
+            models.Index(fields=['rating_average']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return self.name
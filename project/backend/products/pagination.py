@@ -0,0 +1,169 @@
+import base64
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over the view's ordering with a tiebreak on the primary key.
+
+    Each page is fetched with a WHERE clause on the last row's sort key instead
+    of an OFFSET, and no COUNT(*) is run, so deep pages cost the same as the first.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    tiebreak_field = 'pk'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        cursor = self.decode_cursor(request, queryset.model)
+        self.reverse = bool(cursor and cursor['reverse'])
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [self.flip(field) for field in ordering]
+        # Fetch one extra row to know whether another page follows
+        results = self.fetch(queryset, ordering, cursor, self.page_size + 1, view)
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = cursor is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = results
+        return results
+
+    def fetch(self, queryset, ordering, cursor, limit, view=None):
+        """Up to limit rows after the cursor position in the given ordering"""
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(ordering, cursor['position']))
+        return list(queryset[:limit])
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = list(ordering or getattr(view, 'ordering', None) or queryset.model._meta.ordering or [])
+        return self.with_tiebreak(ordering)
+    
+    def with_tiebreak(self, ordering):
+        if not any(field.lstrip('-') in (self.tiebreak_field, 'id') for field in ordering):
+            # Follow the direction of the primary sort key
+            prefix = '-' if ordering and ordering[0].startswith('-') else ''
+            ordering.append(prefix + self.tiebreak_field)
+        return ordering
+
+    @staticmethod
+    def flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    def seek_filter(self, ordering, position):
+        """Rows strictly after position: (a > x) OR (a = x AND b > y) ..."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if len(data['p']) != len(self.fields):
+                raise ValueError
+            position = [
+                (model._meta.pk if field == 'pk' else model._meta.get_field(field)).to_python(value)
+                for field, value in zip(self.fields, data['p'])
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeError, FieldDoesNotExist, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return {'position': position, 'reverse': bool(data.get('r'))}
+
+    def encode_cursor(self, instance, reverse):
+        position = [self.position_value(instance, field) for field in self.fields]
+        data = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    @staticmethod
+    def position_value(instance, field):
+        value = getattr(instance, field)
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        if isinstance(value, (int, float, str)) or value is None:
+            return value
+        return str(value)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+class CatalogPagination(BasePagination):
+    """
+    Keyset pagination for catalog listings, falling back to page numbers
+    (with a total count) when the client sends a ?page= parameter.
+    """
+    page_query_param = 'page'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.page_query_param in request.query_params:
+            self.paginator = PageNumberPagination()
+        else:
+            self.paginator = KeysetPagination()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
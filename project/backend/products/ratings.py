@@ -0,0 +1,118 @@
+from collections import Counter, defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import transaction
+from django.db.models import Case, When, Value, F, Count, DecimalField, FloatField, ExpressionWrapper
+from django.db.models.functions import Cast, Round
+from django.db.models.lookups import GreaterThan
+from .models import Product, Review, RATING_FIELDS
+from .response_cache import bump_version_on_commit
+from .cards import refresh_product_cards
+
+STARS = range(1, 6)
+
+def rating_deltas(previous, current):
+    """
+    Per-product star histogram changes between two review rating states.
+
+    A state is (product_id, rating, is_approved) or None for a review that
+    doesn't exist; only approved reviews count towards the aggregates.
+    """
+    deltas = defaultdict(Counter)
+    if previous and previous[2]:
+        deltas[previous[0]][previous[1]] -= 1
+    if current and current[2]:
+        deltas[current[0]][current[1]] += 1
+    return deltas
+
+def apply_rating_deltas(deltas):
+    """Apply per-product histogram deltas with one UPDATE per product"""
+    changed = []
+    for product_id, histogram in deltas.items():
+        histogram = {star: n for star, n in histogram.items() if n}
+        if not histogram:
+            continue
+        count_delta = sum(histogram.values())
+        sum_delta = sum(star * n for star, n in histogram.items())
+        count = F('rating_count') + count_delta
+        total = F('rating_sum') + sum_delta
+        # Computed from the row's current values so concurrent deltas don't race
+        average = Case(
+            When(GreaterThan(count, 0), then=Round(ExpressionWrapper(
+                total * Value(1.0) / count, output_field=FloatField()
+            ), 2)),
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        fields = {
+            'rating_count': count,
+            'rating_sum': total,
+            'rating_average': Cast(average, DecimalField(max_digits=3, decimal_places=2)),
+        }
+        for star, n in histogram.items():
+            fields[f'rating_{star}_count'] = F(f'rating_{star}_count') + n
+        Product.objects.filter(pk=product_id).update(**fields)
+        changed.append(product_id)
+    refresh_product_cards(changed)
+
+def set_reviews_approved(queryset, approved):
+    """Bulk approve or disapprove reviews, adjusting product ratings by delta"""
+    with transaction.atomic():
+        changed = list(
+            queryset.filter(is_approved=not approved)
+            .select_for_update()
+            .values_list('pk', 'product_id', 'rating')
+        )
+        if not changed:
+            return 0
+        Review.objects.filter(pk__in=[pk for pk, _, _ in changed]).update(is_approved=approved)
+        sign = 1 if approved else -1
+        deltas = defaultdict(Counter)
+        for _, product_id, rating in changed:
+            deltas[product_id][rating] += sign
+        apply_rating_deltas(deltas)
+        # queryset.update() doesn't send signals
+        bump_version_on_commit(Review)
+    return len(changed)
+
+def recompute_ratings(products=None, batch_size=500):
+    """
+    Rebuild rating aggregates from approved reviews.
+
+    One grouped query counts reviews per (product, star) and the products are
+    written back with bulk_update, so a full repair costs a handful of
+    statements per batch rather than several queries per product.
+    """
+    products = Product.objects.all() if products is None else products
+    product_ids = list(products.order_by().values_list('pk', flat=True))
+    updated = 0
+    for start in range(0, len(product_ids), batch_size):
+        batch_ids = product_ids[start:start + batch_size]
+        histograms = defaultdict(Counter)
+        rows = (
+            Review.objects.filter(product_id__in=batch_ids, is_approved=True)
+            .order_by()
+            .values_list('product_id', 'rating')
+            .annotate(n=Count('id'))
+        )
+        for product_id, rating, n in rows:
+            histograms[product_id][rating] = n
+
+        batch = []
+        for product_id in batch_ids:
+            histogram = histograms.get(product_id, Counter())
+            product = Product(pk=product_id)
+            product.rating_count = sum(histogram.values())
+            product.rating_sum = sum(star * n for star, n in histogram.items())
+            product.rating_average = (
+                (Decimal(product.rating_sum) / product.rating_count).quantize(Decimal('0.01'), ROUND_HALF_UP)
+                if product.rating_count else Decimal('0')
+            )
+            for star in STARS:
+                setattr(product, f'rating_{star}_count', histogram.get(star, 0))
+            batch.append(product)
+        with transaction.atomic():
+            Product.objects.bulk_update(batch, RATING_FIELDS)
+            refresh_product_cards(batch_ids)
+        updated += len(batch)
+    bump_version_on_commit(Product)
+    return updated
@@ -0,0 +1,112 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.response import Response
+
+VERSION_KEY = 'catalog:version:{}'
+HITS_KEY = 'catalog:stats:hits'
+MISSES_KEY = 'catalog:stats:misses'
+
+def get_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+def is_process_local(cache):
+    """True for backends each worker process keeps to itself, so versions bumped there aren't seen by other workers"""
+    return isinstance(cache, (LocMemCache, DummyCache))
+
+def version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+def get_versions(models):
+    """Current version of each model, one cache round trip"""
+    cache = get_cache()
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Seed from the clock so an evicted counter never reuses an old version
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+def bump_version(model):
+    """Invalidate every cached response that depends on model"""
+    cache = get_cache()
+    key = version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+
+def bump_version_on_commit(model):
+    transaction.on_commit(lambda: bump_version(model))
+
+def count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+def get_stats():
+    values = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    hits = values.get(HITS_KEY, 0)
+    misses = values.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 4) if total else 0,
+    }
+
+def response_key(request, view_name, models):
+    """Key on normalized path and sorted query parameters plus the model versions"""
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    raw = '|'.join([
+        request.scheme,
+        request.get_host(),
+        request.path,
+        '&'.join(f'{key}={value}' for key, value in params),
+    ])
+    versions = '.'.join(str(version) for version in get_versions(models))
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'catalog:response:{view_name}:{digest}:{versions}'
+
+class CatalogCacheMixin:
+    """
+    Cache anonymous GET responses for catalog views.
+
+    Entries are keyed on the request plus the version counters of
+    cache_models, which signal handlers bump whenever those models change.
+    """
+    cache_models = ()
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = response_key(request, type(self).__name__, self.cache_models)
+        data = cache.get(key)
+        if data is not None:
+            count(HITS_KEY)
+            self.cache_hit(request, data)
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        count(MISSES_KEY)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def cache_hit(self, request, data):
+        """Hook for side effects that must still run when a response is served from cache"""
@@ -0,0 +1,212 @@
+import re
+import uuid
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from .models import Product
+
+# Fields copied into the search index, in column order
+INDEXED_FIELDS = ('name', 'brand', 'tags', 'description')
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+def search_terms(query):
+    """Split a user query into plain word terms safe to embed in a full-text query"""
+    return TERM_RE.findall(query or '')[:10]
+
+def document_fields(name, brand, tags, description):
+    if isinstance(tags, (list, tuple)):
+        tags = ' '.join(str(tag) for tag in tags)
+    return [name or '', brand or '', tags or '', description or '']
+
+class BaseSearchBackend:
+    """Product search index backend"""
+
+    def index(self, products):
+        """Add or refresh the index entries for the given products"""
+
+    def remove(self, product_ids):
+        """Drop the index entries for the given product ids"""
+
+    def rebuild(self, batch_size=1000):
+        """Rebuild the whole index from the products table, returning the number of rows indexed"""
+        return 0
+
+    def search(self, queryset, query):
+        """Filter the queryset to matching products ordered by relevance"""
+        raise NotImplementedError
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """Unindexed fallback matching the original icontains lookup"""
+
+    def search(self, queryset, query):
+        return queryset.filter(
+            Q(name__icontains=query)
+            | Q(description__icontains=query)
+            | Q(brand__icontains=query)
+            | Q(tags__icontains=query)
+        )
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """SQLite FTS5 index stored in the products_fts virtual table"""
+
+    # bm25 weights for (product_id, name, brand, tags, description)
+    RANK = 'bm25(products_fts, 0.0, 10.0, 5.0, 3.0, 1.0)'
+
+    def index(self, products):
+        rows = [
+            [product.id.hex] + document_fields(product.name, product.brand, product.tags, product.description)
+            for product in products
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany('DELETE FROM products_fts WHERE product_id = %s', [[row[0]] for row in rows])
+            cursor.executemany(
+                'INSERT INTO products_fts (product_id, name, brand, tags, description) VALUES (%s, %s, %s, %s, %s)',
+                rows
+            )
+
+    def remove(self, product_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'DELETE FROM products_fts WHERE product_id = %s',
+                [[uuid.UUID(str(pk)).hex] for pk in product_ids]
+            )
+
+    def rebuild(self, batch_size=1000):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM products_fts')
+        count = 0
+        batch = []
+        products = Product.objects.only(*(('id',) + INDEXED_FIELDS)).order_by().iterator(chunk_size=batch_size)
+        for product in products:
+            batch.append(product)
+            if len(batch) >= batch_size:
+                self.index(batch)
+                count += len(batch)
+                batch = []
+        self.index(batch)
+        count += len(batch)
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO products_fts (products_fts) VALUES ('optimize')")
+        return count
+
+    def search(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        # Every term must match, each as a prefix
+        match = ' '.join(f'"{term}"*' for term in terms)
+        try:
+            candidates, params = queryset.order_by().values('pk').query.sql_with_params()
+        except EmptyResultSet:
+            return queryset.none()
+        # Restrict to the queryset's rows before the LIMIT, so inactive or
+        # filtered-out products can't use up the result cap
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT product_id FROM products_fts WHERE products_fts MATCH %s AND product_id IN ({candidates}) '
+                f'ORDER BY {self.RANK} LIMIT %s',
+                [match, *params, getattr(settings, 'PRODUCT_SEARCH_MAX_RESULTS', 1000)]
+            )
+            ids = [uuid.UUID(row[0]) for row in cursor.fetchall()]
+        if not ids:
+            return queryset.none()
+        rank = Case(
+            *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)],
+            output_field=IntegerField()
+        )
+        return queryset.filter(pk__in=ids).annotate(search_rank=rank).order_by('search_rank')
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """Postgres tsvector index stored in products_search with a GIN index"""
+
+    DOCUMENT = (
+        "setweight(to_tsvector('english', %s), 'A') || "
+        "setweight(to_tsvector('english', %s), 'B') || "
+        "setweight(to_tsvector('english', %s), 'B') || "
+        "setweight(to_tsvector('english', %s), 'C')"
+    )
+
+    def index(self, products):
+        rows = [
+            [str(product.id)] + document_fields(product.name, product.brand, product.tags, product.description)
+            for product in products
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO products_search (product_id, document) VALUES (%s, {self.DOCUMENT}) '
+                'ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document',
+                rows
+            )
+
+    def remove(self, product_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM products_search WHERE product_id = ANY(%s::uuid[])',
+                [[str(pk) for pk in product_ids]]
+            )
+
+    REBUILD = (
+        "INSERT INTO products_search (product_id, document) "
+        "SELECT id, "
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(brand, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce("
+        "(SELECT string_agg(value, ' ') FROM jsonb_array_elements_text("
+        "CASE WHEN jsonb_typeof(tags::jsonb) = 'array' THEN tags::jsonb ELSE '[]'::jsonb END)), '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'C') "
+        "FROM products"
+    )
+
+    def rebuild(self, batch_size=1000):
+        # A single set-based statement is faster than batching through Python on Postgres
+        with connection.cursor() as cursor:
+            cursor.execute('TRUNCATE products_search')
+            cursor.execute(self.REBUILD)
+            return cursor.rowcount
+
+    def search(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        matches = RawSQL(
+            "SELECT product_id FROM products_search WHERE document @@ to_tsquery('english', %s)",
+            [tsquery]
+        )
+        # Works for any model keyed by product id (Product, ProductCard)
+        opts = queryset.model._meta
+        rank = RawSQL(
+            "SELECT ts_rank_cd(document, to_tsquery('english', %s)) FROM products_search "
+            f'WHERE products_search.product_id = "{opts.db_table}"."{opts.pk.column}"',
+            [tsquery]
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank).order_by('-search_rank')
+
+DEFAULT_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_backend = None
+
+def get_search_backend():
+    """Return the configured backend, picking one for the database vendor by default"""
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, 'PRODUCT_SEARCH_BACKEND', None)
+        if backend_path:
+            _backend = import_string(backend_path)()
+        else:
+            _backend = DEFAULT_BACKENDS.get(connection.vendor, SimpleSearchBackend)()
+    return _backend
+
+def search_products(queryset, query):
+    return get_search_backend().search(queryset, query)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.db.models import Avg
-from .models import Category, Product, ProductImage, Review, Wishlist
+from .models import Category, Product, ProductCard, ProductImage, Review, Wishlist
+from .wishlist import get_wishlist_ids
 
 class CategorySerializer(serializers.ModelSerializer):
     """Category Serializer"""
@@ -17,13 +18,30 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'slug', 'created_at', 'updated_at']
     
     def get_children(self, obj):
+        tree = self.context.get('category_tree')
+        if tree is not None:
+            return CategorySerializer(tree.children.get(obj.id, []), many=True, context=self.context).data
         if obj.children.exists():
             return CategorySerializer(obj.children.filter(is_active=True), many=True).data
         return []
     
     def get_product_count(self, obj):
+        tree = self.context.get('category_tree')
+        if tree is not None:
+            return tree.product_counts.get(obj.id, 0)
         return obj.products.filter(is_active=True).count()
 
+class WishlistStatusMixin:
+    """Resolves is_wishlisted from the user's cached wishlist, once per serializer tree"""
+    
+    def get_is_wishlisted(self, obj):
+        request = self.context.get('request')
+        if not (request and request.user.is_authenticated):
+            return False
+        if 'wishlist_ids' not in self.context:
+            self.context['wishlist_ids'] = get_wishlist_ids(request.user)
+        return obj.pk in self.context['wishlist_ids']
+
 class ProductImageSerializer(serializers.ModelSerializer):
     """Product Image Serializer"""
     
@@ -31,12 +49,13 @@ class ProductImageSerializer(serializers.ModelSerializer):
         model = ProductImage
         fields = ['id', 'image_url', 'alt_text', 'is_primary', 'sort_order']
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(WishlistStatusMixin, serializers.ModelSerializer):
     """Product List Serializer (for listing products)"""
     category_name = serializers.CharField(source='category.name', read_only=True)
     primary_image = serializers.SerializerMethodField()
     is_in_stock = serializers.ReadOnlyField()
     discount_percentage = serializers.ReadOnlyField()
+    is_wishlisted = serializers.SerializerMethodField()
     
     class Meta:
         model = Product
@@ -44,16 +63,23 @@ class ProductListSerializer(serializers.ModelSerializer):
             'id', 'name', 'slug', 'short_description', 'price', 'original_price',
             'category', 'category_name', 'brand', 'primary_image', 'is_in_stock',
             'rating_average', 'rating_count', 'discount_percentage', 'is_featured',
-            'created_at'
+            'is_wishlisted', 'created_at'
         ]
     
     def get_primary_image(self, obj):
-        if obj.images:
-            return obj.images[0] if obj.images else None
-        primary_image = obj.product_images.filter(is_primary=True).first()
-        return primary_image.image_url if primary_image else None
+        return obj.primary_image
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductCardSerializer(WishlistStatusMixin, serializers.ModelSerializer):
+    """Product Card Serializer (ProductListSerializer output from the card read model)"""
+    id = serializers.UUIDField(source='product_id', read_only=True)
+    discount_percentage = serializers.ReadOnlyField()
+    is_wishlisted = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ProductCard
+        fields = ProductListSerializer.Meta.fields
+
+class ProductDetailSerializer(WishlistStatusMixin, serializers.ModelSerializer):
     """Product Detail Serializer (for single product)"""
     category = CategorySerializer(read_only=True)
     product_images = ProductImageSerializer(many=True, read_only=True)
@@ -62,6 +88,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     is_low_stock = serializers.ReadOnlyField()
     discount_percentage = serializers.ReadOnlyField()
     is_wishlisted = serializers.SerializerMethodField()
+    rating_distribution = serializers.ReadOnlyField()
     
     class Meta:
         model = Product
@@ -69,7 +96,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             'id', 'name', 'slug', 'description', 'short_description', 'price',
             'original_price', 'sku', 'stock_quantity', 'category', 'brand',
             'weight', 'dimensions', 'images', 'tags', 'is_active', 'is_featured',
-            'rating_average', 'rating_count', 'view_count', 'product_images',
+            'rating_average', 'rating_count', 'rating_distribution', 'view_count', 'product_images',
             'reviews', 'is_in_stock', 'is_low_stock', 'discount_percentage',
             'is_wishlisted', 'created_at', 'updated_at'
         ]
@@ -78,12 +105,6 @@ class ProductDetailSerializer(serializers.ModelSerializer):
         reviews = obj.reviews.filter(is_approved=True)[:5]  # Latest 5 reviews
         return ReviewSerializer(reviews, many=True).data
     
-    def get_is_wishlisted(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.wishlisted_by.filter(user=request.user).exists()
-        return False
-
 class ProductCreateUpdateSerializer(serializers.ModelSerializer):
     """Product Create/Update Serializer"""
     
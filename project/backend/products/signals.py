@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Category, Product, ProductImage, Review, Wishlist
+from .category_tree import invalidate_category_tree
+from .search import get_search_backend
+from .ratings import apply_rating_deltas, rating_deltas
+from .response_cache import bump_version_on_commit
+from .wishlist import invalidate_wishlist
+from .cards import CARD_SOURCE_FIELDS, refresh_product_cards, rename_category_cards
+
+# Product fields that change what the category tree renders
+CATEGORY_TREE_PRODUCT_FIELDS = {'is_active', 'category', 'category_id'}
+
+# Product fields copied into the search index
+SEARCH_INDEX_PRODUCT_FIELDS = {'name', 'description', 'brand', 'tags'}
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_category_tree)
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, update_fields=None, **kwargs):
+    # Rating and other partial updates don't affect the tree
+    if update_fields is not None and not CATEGORY_TREE_PRODUCT_FIELDS & set(update_fields):
+        return
+    transaction.on_commit(invalidate_category_tree)
+
+@receiver(post_save, sender=Product)
+def product_search_index_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_INDEX_PRODUCT_FIELDS & set(update_fields):
+        return
+    get_search_backend().index([instance])
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    transaction.on_commit(invalidate_category_tree)
+    get_search_backend().remove([instance.pk])
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    previous = getattr(instance, '_rating_state', None) or instance.rating_state()
+    apply_rating_deltas(rating_deltas(previous, None))
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def catalog_changed(sender, **kwargs):
+    bump_version_on_commit(sender)
+
+@receiver(post_save, sender=Wishlist)
+@receiver(post_delete, sender=Wishlist)
+def wishlist_changed(sender, instance, **kwargs):
+    invalidate_wishlist(instance.user_id)
+
+@receiver(post_save, sender=Product)
+def product_card_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not CARD_SOURCE_FIELDS & set(update_fields):
+        return
+    refresh_product_cards([instance.pk])
+
+@receiver(post_save, sender=Category)
+def category_card_saved(sender, instance, created=False, **kwargs):
+    if not created:
+        rename_category_cards(instance)
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_image_card_changed(sender, instance, **kwargs):
+    refresh_product_cards([instance.product_id])
@@ -12,6 +12,8 @@ urlpatterns = [
     path('', views.ProductListView.as_view(), name='product_list'),
     path('featured/', views.FeaturedProductsView.as_view(), name='featured_products'),
     path('search/', views.ProductSearchView.as_view(), name='product_search'),
+    path('facets/', views.ProductFacetsView.as_view(), name='product_facets'),
+    path('cache-stats/', views.catalog_cache_stats, name='catalog_cache_stats'),
     path('<slug:slug>/', views.ProductDetailView.as_view(), name='product_detail'),
     
     # Reviews
@@ -21,6 +23,7 @@ urlpatterns = [
     
     # Wishlist
     path('wishlist/', views.WishlistView.as_view(), name='wishlist'),
+    path('wishlist/status/', views.wishlist_membership, name='wishlist_status'),
     path('wishlist/<uuid:pk>/', views.WishlistDetailView.as_view(), name='wishlist_detail'),
     path('<uuid:product_id>/wishlist/toggle/', views.toggle_wishlist, name='toggle_wishlist'),
 ]
\ No newline at end of file
@@ -0,0 +1,84 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+class ViewCounter:
+    """
+    Per-process write-behind buffer for Product.view_count.
+
+    Increments are collected in memory and flushed as one UPDATE per distinct
+    increment (products sharing the same pending count are updated together)
+    once the threshold is reached, the interval elapses, or the process exits.
+    """
+
+    def __init__(self, interval=None, threshold=None):
+        self.interval = interval if interval is not None else getattr(settings, 'VIEW_COUNT_FLUSH_INTERVAL', 10)
+        self.threshold = threshold if threshold is not None else getattr(settings, 'VIEW_COUNT_FLUSH_THRESHOLD', 100)
+        self.pending = Counter()
+        self.pending_total = 0
+        self.lock = threading.Lock()
+        self.flusher = None
+
+    def increment(self, product_id, amount=1):
+        with self.lock:
+            self.pending[product_id] += amount
+            self.pending_total += amount
+            total = self.pending_total
+        if total >= self.threshold:
+            self.flush()
+        else:
+            self.start_flusher()
+
+    def start_flusher(self):
+        if self.flusher is not None or self.interval <= 0:
+            return
+        with self.lock:
+            if self.flusher is None:
+                self.flusher = threading.Thread(target=self.run_flusher, name='view-counter-flusher', daemon=True)
+                self.flusher.start()
+
+    def run_flusher(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            finally:
+                # Don't keep a connection open in an idle background thread
+                connection.close()
+
+    def flush(self):
+        """Write all pending increments, returning the number of products updated"""
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.pending_total = 0
+        if not pending:
+            return 0
+
+        by_amount = defaultdict(list)
+        for product_id, amount in pending.items():
+            by_amount[amount].append(product_id)
+        try:
+            with transaction.atomic():
+                for amount, product_ids in by_amount.items():
+                    Product.objects.filter(pk__in=product_ids).update(view_count=F('view_count') + amount)
+        except Exception:
+            logger.exception('Failed to flush %d product view counts', len(pending))
+            # Keep the increments for the next flush
+            with self.lock:
+                self.pending.update(pending)
+                self.pending_total += sum(pending.values())
+            return 0
+        return len(pending)
+
+view_counter = ViewCounter()
+
+# Flush buffered views when the worker shuts down gracefully
+atexit.register(view_counter.flush)
@@ -1,20 +1,32 @@
+import hashlib
+import uuid
 from rest_framework import generics, permissions, status, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q, F
+from django.conf import settings
+from django.db.models import F, Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from .models import Category, Product, Review, Wishlist
+from .models import Category, Product, ProductCard, ProductImage, Review, Wishlist
 from .serializers import (
-    CategorySerializer, ProductListSerializer, ProductDetailSerializer,
+    CategorySerializer, ProductListSerializer, ProductCardSerializer, ProductDetailSerializer,
     ProductCreateUpdateSerializer, ReviewSerializer, ReviewCreateSerializer,
     WishlistSerializer, WishlistCreateSerializer
 )
-from .filters import ProductFilter
+from .filters import ProductFilter, ProductCardFilter
+from .pagination import CatalogPagination
+from .category_tree import get_category_tree
+from .search import search_products
+from .view_counter import view_counter
+from .response_cache import CatalogCacheMixin, get_cache, get_stats, get_versions
+from .facets import compute_facets
+from .wishlist import get_wishlist_ids, toggle_wishlist_item, wishlist_status
+from .cards import use_product_cards, card_to_dict
 
-class CategoryListView(generics.ListCreateAPIView):
+class CategoryListView(CatalogCacheMixin, generics.ListCreateAPIView):
     """List all categories or create new category"""
+    cache_models = (Category, Product)
     queryset = Category.objects.filter(is_active=True, parent=None)
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
@@ -24,14 +36,23 @@ class CategoryListView(generics.ListCreateAPIView):
             return [permissions.IsAuthenticated()]
         return [permissions.AllowAny()]
     
+    def list(self, request, *args, **kwargs):
+        # Served from the cached category tree
+        roots = get_category_tree()['roots']
+        page = self.paginate_queryset(roots)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(roots)
+    
     def perform_create(self, serializer):
         # Only admin can create categories
         if not self.request.user.is_admin:
             raise permissions.PermissionDenied("Only admins can create categories")
         serializer.save()
 
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryDetailView(CatalogCacheMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a category"""
+    cache_models = (Category, Product)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
@@ -41,6 +62,13 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
     
+    def retrieve(self, request, *args, **kwargs):
+        node = get_category_tree()['by_slug'].get(kwargs.get(self.lookup_field))
+        if node is not None:
+            return Response(node)
+        # Inactive categories are not part of the cached tree
+        return super().retrieve(request, *args, **kwargs)
+    
     def perform_update(self, serializer):
         if not self.request.user.is_admin:
             raise permissions.PermissionDenied("Only admins can update categories")
@@ -51,21 +79,65 @@ class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
             raise permissions.PermissionDenied("Only admins can delete categories")
         instance.delete()
 
-class ProductListView(generics.ListCreateAPIView):
+class ProductCardMixin:
+    """
+    Serve GET listings from the ProductCard read model when
+    PRODUCT_CARD_READ_MODEL is on, optionally bypassing the serializer.
+    """
+    card_filters = {}
+    product_filterset_class = None
+    card_filterset_class = None
+    
+    def reads_cards(self):
+        return self.request.method == 'GET' and use_product_cards()
+    
+    @property
+    def filterset_class(self):
+        if self.reads_cards():
+            return self.card_filterset_class
+        return self.product_filterset_class
+    
+    def get_queryset(self):
+        if self.reads_cards():
+            return ProductCard.objects.filter(is_active=True, **self.card_filters)
+        return super().get_queryset()
+    
+    def get_serializer_class(self):
+        if self.reads_cards():
+            return ProductCardSerializer
+        return super().get_serializer_class()
+    
+    def list(self, request, *args, **kwargs):
+        if not (self.reads_cards() and getattr(settings, 'PRODUCT_CARD_SERIALIZER_BYPASS', False)):
+            return super().list(request, *args, **kwargs)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        wishlist_ids = get_wishlist_ids(request.user) if request.user.is_authenticated else None
+        rows = page if page is not None else queryset
+        data = [card_to_dict(card, wishlist_ids) for card in rows]
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+class ProductListView(CatalogCacheMixin, ProductCardMixin, generics.ListCreateAPIView):
     """List all products or create new product"""
-    queryset = Product.objects.filter(is_active=True)
+    cache_models = (Product, Category, ProductImage, Review)
+    queryset = Product.objects.for_listing().filter(is_active=True)
     serializer_class = ProductListSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_class = ProductFilter
-    search_fields = ['name', 'description', 'brand', 'tags']
+    pagination_class = CatalogPagination
+    # ?search= is handled by ProductFilter through the search index
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    product_filterset_class = ProductFilter
+    card_filterset_class = ProductCardFilter
     ordering_fields = ['price', 'rating_average', 'created_at', 'name']
     ordering = ['-created_at']
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return ProductCreateUpdateSerializer
-        return ProductListSerializer
+        return super().get_serializer_class()
     
     def get_permissions(self):
         if self.request.method == 'POST':
@@ -77,8 +149,9 @@ class ProductListView(generics.ListCreateAPIView):
             raise permissions.PermissionDenied("Only admins can create products")
         serializer.save()
 
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ProductDetailView(CatalogCacheMixin, generics.RetrieveUpdateDestroyAPIView):
     """Retrieve, update or delete a product"""
+    cache_models = (Product, Category, ProductImage, Review)
     queryset = Product.objects.filter(is_active=True)
     serializer_class = ProductDetailSerializer
     lookup_field = 'slug'
@@ -96,11 +169,22 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Increment view count
-        Product.objects.filter(pk=instance.pk).update(view_count=F('view_count') + 1)
+        # Buffered and flushed in batches by the view counter
+        view_counter.increment(instance.pk)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
+    def cache_hit(self, request, data):
+        # Cached responses still count as views
+        product_id = uuid.UUID(data['id'])
+        view_counter.increment(product_id)
+        # Stock changes only bump the catalog version when a product sells out or comes back
+        stock = Product.objects.filter(pk=product_id).values('stock_quantity', 'low_stock_threshold').first()
+        if stock is not None:
+            data['stock_quantity'] = stock['stock_quantity']
+            data['is_in_stock'] = stock['stock_quantity'] > 0
+            data['is_low_stock'] = stock['stock_quantity'] <= stock['low_stock_threshold']
+    
     def perform_update(self, serializer):
         if not self.request.user.is_admin:
             raise permissions.PermissionDenied("Only admins can update products")
@@ -111,11 +195,14 @@ class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
             raise permissions.PermissionDenied("Only admins can delete products")
         instance.delete()
 
-class FeaturedProductsView(generics.ListAPIView):
+class FeaturedProductsView(CatalogCacheMixin, ProductCardMixin, generics.ListAPIView):
     """List featured products"""
-    queryset = Product.objects.filter(is_active=True, is_featured=True)
+    cache_models = (Product, Category, ProductImage, Review)
+    card_filters = {'is_featured': True}
+    queryset = Product.objects.for_listing().filter(is_active=True, is_featured=True)
     serializer_class = ProductListSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = CatalogPagination
 
 class ProductSearchView(generics.ListAPIView):
     """Search products"""
@@ -128,15 +215,41 @@ class ProductSearchView(generics.ListAPIView):
     def get_queryset(self):
         query = self.request.query_params.get('q', '')
         if query:
-            return Product.objects.filter(
-                Q(name__icontains=query) |
-                Q(description__icontains=query) |
-                Q(brand__icontains=query) |
-                Q(tags__icontains=query),
-                is_active=True
-            )
+            # Relevance-ranked unless the client asks for another ordering
+            return search_products(Product.objects.for_listing().filter(is_active=True), query)
         return Product.objects.none()
 
+class ProductFacetsView(generics.GenericAPIView):
+    """Facet counts for the products matching the current filters"""
+    queryset = Product.objects.filter(is_active=True)
+    permission_classes = [permissions.AllowAny]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ProductFilter
+    
+    def get_filter_signature(self):
+        params = set(ProductFilter.base_filters)
+        return '&'.join(
+            f'{key}={value}'
+            for key in sorted(params)
+            for value in self.request.query_params.getlist(key)
+        )
+    
+    def get(self, request, *args, **kwargs):
+        timeout = getattr(settings, 'PRODUCT_FACETS_CACHE_TIMEOUT', 0)
+        cache_key = None
+        if timeout:
+            signature = hashlib.md5(self.get_filter_signature().encode('utf-8')).hexdigest()
+            versions = '.'.join(str(version) for version in get_versions((Product, Category)))
+            cache_key = f'catalog:facets:{signature}:{versions}'
+            facets = get_cache().get(cache_key)
+            if facets is not None:
+                return Response({'success': True, 'data': facets})
+        
+        facets = compute_facets(self.filter_queryset(self.get_queryset()))
+        if cache_key:
+            get_cache().set(cache_key, facets, timeout)
+        return Response({'success': True, 'data': facets})
+
 class ProductReviewListView(generics.ListCreateAPIView):
     """List product reviews or create new review"""
     serializer_class = ReviewSerializer
@@ -184,7 +297,9 @@ class WishlistView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Wishlist.objects.filter(user=self.request.user)
+        return Wishlist.objects.filter(user=self.request.user).prefetch_related(
+            Prefetch('product', queryset=Product.objects.for_listing())
+        )
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -203,32 +318,46 @@ class WishlistDetailView(generics.DestroyAPIView):
 @permission_classes([permissions.IsAuthenticated])
 def toggle_wishlist(request, product_id):
     """Toggle product in wishlist"""
-    try:
-        product = Product.objects.get(id=product_id, is_active=True)
-        wishlist_item, created = Wishlist.objects.get_or_create(
-            user=request.user,
-            product=product
-        )
-        
-        if not created:
-            wishlist_item.delete()
-            return Response({
-                'success': True,
-                'message': 'Product removed from wishlist',
-                'in_wishlist': False
-            })
-        else:
-            return Response({
-                'success': True,
-                'message': 'Product added to wishlist',
-                'in_wishlist': True
-            })
-    
-    except Product.DoesNotExist:
+    added = toggle_wishlist_item(request.user, product_id)
+    if added is None:
         return Response({
             'success': False,
             'message': 'Product not found'
         }, status=status.HTTP_404_NOT_FOUND)
+    
+    if added:
+        return Response({
+            'success': True,
+            'message': 'Product added to wishlist',
+            'in_wishlist': True
+        })
+    return Response({
+        'success': True,
+        'message': 'Product removed from wishlist',
+        'in_wishlist': False
+    })
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def wishlist_membership(request):
+    """Report which of the given products are in the user's wishlist"""
+    if request.method == 'POST':
+        product_ids = request.data.get('product_ids', [])
+    else:
+        product_ids = [pk for pk in request.query_params.get('ids', '').split(',') if pk]
+    
+    try:
+        product_ids = [uuid.UUID(str(pk)) for pk in product_ids]
+    except (TypeError, ValueError, AttributeError):
+        return Response({
+            'success': False,
+            'message': 'Invalid product id'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'success': True,
+        'data': wishlist_status(request.user, product_ids)
+    })
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -249,4 +378,18 @@ def mark_review_helpful(request, review_id):
         return Response({
             'success': False,
             'message': 'Review not found'
-        }, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        }, status=status.HTTP_404_NOT_FOUND)
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def catalog_cache_stats(request):
+    """Catalog response cache hit/miss counters"""
+    if not request.user.is_admin:
+        return Response({
+            'success': False,
+            'message': 'Only admins can view cache statistics'
+        }, status=status.HTTP_403_FORBIDDEN)
+    return Response({
+        'success': True,
+        'data': get_stats()
+    })
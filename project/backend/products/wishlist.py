@@ -0,0 +1,83 @@
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import Product, Wishlist
+from .response_cache import is_process_local
+
+WISHLIST_CACHE_KEY = 'wishlist:ids:{}'
+
+def wishlist_cache_key(user_id):
+    return WISHLIST_CACHE_KEY.format(user_id)
+
+def get_wishlist_ids(user):
+    """Set of product ids in the user's wishlist, cached until the wishlist changes"""
+    if is_process_local(cache):
+        # Another worker's toggle can't delete this process's copy
+        return frozenset(Wishlist.objects.filter(user=user).values_list('product_id', flat=True))
+    key = wishlist_cache_key(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Wishlist.objects.filter(user=user).values_list('product_id', flat=True))
+        cache.set(key, ids, getattr(settings, 'WISHLIST_CACHE_TIMEOUT', 3600))
+    return ids
+
+def invalidate_wishlist(user_id):
+    transaction.on_commit(lambda: cache.delete(wishlist_cache_key(user_id)))
+
+def wishlist_status(user, product_ids):
+    """Map each product id to whether it is in the user's wishlist"""
+    ids = get_wishlist_ids(user)
+    return {str(product_id): product_id in ids for product_id in product_ids}
+
+def _db_value(model, field_name, value):
+    return model._meta.get_field(field_name).get_db_prep_value(value, connection)
+
+POSTGRES_TOGGLE = """
+WITH removed AS (
+    DELETE FROM wishlist WHERE user_id = %(user)s AND product_id = %(product)s RETURNING 1
+), added AS (
+    INSERT INTO wishlist (id, user_id, product_id, created_at)
+    SELECT %(id)s, %(user)s, id, %(now)s FROM products
+    WHERE id = %(product)s AND is_active AND NOT EXISTS (SELECT 1 FROM removed)
+    ON CONFLICT (user_id, product_id) DO NOTHING
+    RETURNING 1
+)
+SELECT (SELECT count(*) FROM removed), (SELECT count(*) FROM added)
+"""
+
+def toggle_wishlist_item(user, product_id):
+    """
+    Add the product to the wishlist or remove it if already present.
+
+    Returns True when added, False when removed and None when the product
+    doesn't exist or is inactive. Postgres does this in a single statement;
+    other databases delete first and only insert when nothing was deleted.
+    """
+    params = {
+        'id': _db_value(Wishlist, 'id', uuid.uuid4()),
+        'user': _db_value(Wishlist, 'user', user.pk),
+        'product': _db_value(Product, 'id', product_id),
+        'now': _db_value(Wishlist, 'created_at', timezone.now()),
+    }
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(POSTGRES_TOGGLE, params)
+            removed, added = cursor.fetchone()
+        else:
+            cursor.execute('DELETE FROM wishlist WHERE user_id = %(user)s AND product_id = %(product)s', params)
+            removed, added = cursor.rowcount, 0
+            if not removed:
+                cursor.execute(
+                    'INSERT INTO wishlist (id, user_id, product_id, created_at) '
+                    'SELECT %(id)s, %(user)s, id, %(now)s FROM products '
+                    'WHERE id = %(product)s AND is_active = %(active)s '
+                    'ON CONFLICT (user_id, product_id) DO NOTHING',
+                    dict(params, active=True)
+                )
+                added = cursor.rowcount
+        invalidate_wishlist(user.pk)
+    if removed:
+        return False
+    return True if added else None